@@ -1,9 +1,53 @@
 import sys
+import math
+import struct
+import time
+from array import array
+import micropython
 import uselect
 
 from lcd_1in28 import LCD_1inch28
 
 
+PROTOCOL_VERSION = 1
+
+# Binary packets carry bytes that would otherwise trigger Ctrl-C, so the
+# keyboard interrupt is disabled while a host is streaming them. It is
+# restored after this much idle time so mpremote can still take over.
+SESSION_IDLE_MS = 30000
+
+# Optional commands advertised in the hello reply
+CAPS = ("blit", "arc", "ack")
+
+# Arcs are drawn as filled quads every ARC_STEP degrees, using a sine table
+# scaled by 1024 so no float math happens per frame.
+ARC_STEP = 4
+SIN_TABLE = [int(round(math.sin(math.radians(deg)) * 1024)) for deg in range(360)]
+
+# Opcode -> (lcd method, struct format of the fixed payload).
+# Must match BINARY_COMMANDS in host/protocol.py.
+BINARY_COMMANDS = {
+    0x80: ("fill", "<H"),
+    0x81: ("pixel", "<hhH"),
+    0x82: ("hline", "<hhhH"),
+    0x83: ("vline", "<hhhH"),
+    0x84: ("line", "<hhhhH"),
+    0x85: ("rect", "<hhhhH"),
+    0x86: ("fill_rect", "<hhhhH"),
+    0x87: ("circle", "<hhhH"),
+    0x88: ("text", "<hhH"),
+    0x89: ("show", ""),
+    0x8A: ("blit", "<hhhh"),
+    0x8B: ("arc", "<hhhhhhH"),
+}
+BINARY_SIZES = {op: struct.calcsize(fmt) for op, (_, fmt) in BINARY_COMMANDS.items()}
+
+binary_session = False
+# Set by the host with "acks,1": an "ack" line is sent after every show so
+# the host can limit how many frames it has in flight
+ack_frames = False
+
+
 def parse_arg(arg):
     """Parse argument as int or return as string."""
     try:
@@ -12,21 +56,94 @@ def parse_arg(arg):
         return arg
 
 
+def start_session():
+    """Reply to the host handshake and switch to binary-safe input."""
+    global binary_session
+    micropython.kbd_intr(-1)
+    binary_session = True
+    print("hello,%d,%s" % (PROTOCOL_VERSION, ",".join(CAPS)))
+
+
+def end_session():
+    global binary_session, ack_frames
+    micropython.kbd_intr(3)
+    binary_session = False
+    ack_frames = False
+
+
+def set_acks(enabled):
+    global ack_frames
+    ack_frames = bool(enabled)
+
+
+def show(lcd):
+    lcd.show()
+    if ack_frames:
+        print("ack")
+
+
+_quad = array("h", [0] * 8)
+
+
+def draw_arc(lcd, cx, cy, radius, thickness, start_deg, end_deg, color):
+    """Draw a filled ring segment; angles are CCW from 3 o'clock."""
+    inner = max(radius - thickness + 1, 0)
+    step = ARC_STEP if end_deg >= start_deg else -ARC_STEP
+    quad = _quad
+    angle = start_deg
+    # Outer/inner points of the first edge
+    sin_a = SIN_TABLE[angle % 360]
+    cos_a = SIN_TABLE[(angle + 90) % 360]
+    ox0 = cx + ((radius * cos_a + 512) >> 10)
+    oy0 = cy - ((radius * sin_a + 512) >> 10)
+    ix0 = cx + ((inner * cos_a + 512) >> 10)
+    iy0 = cy - ((inner * sin_a + 512) >> 10)
+    while angle != end_deg:
+        next_angle = angle + step
+        if (step > 0 and next_angle > end_deg) or (step < 0 and next_angle < end_deg):
+            next_angle = end_deg
+        sin_a = SIN_TABLE[next_angle % 360]
+        cos_a = SIN_TABLE[(next_angle + 90) % 360]
+        ox1 = cx + ((radius * cos_a + 512) >> 10)
+        oy1 = cy - ((radius * sin_a + 512) >> 10)
+        ix1 = cx + ((inner * cos_a + 512) >> 10)
+        iy1 = cy - ((inner * sin_a + 512) >> 10)
+        quad[0] = ox0
+        quad[1] = oy0
+        quad[2] = ox1
+        quad[3] = oy1
+        quad[4] = ix1
+        quad[5] = iy1
+        quad[6] = ix0
+        quad[7] = iy0
+        lcd.poly(0, 0, quad, color, True)
+        ox0, oy0, ix0, iy0 = ox1, oy1, ix1, iy1
+        angle = next_angle
+
+
 def execute_command(lcd, line):
     """Parse CSV command and execute on lcd object."""
     parts = line.strip().split(',')
     if not parts:
         return
-    
+
     cmd = parts[0]
     args = [parse_arg(arg) for arg in parts[1:]]
-    
+
     try:
         # Handle special method name mappings
-        if cmd == "circle":
+        if cmd == "hello":
+            start_session()
+        elif cmd == "acks":
+            set_acks(args and args[0])
+        elif cmd == "show":
+            show(lcd)
+        elif cmd == "circle":
             if len(args) >= 4:
                 x, y, r, color = args[:4]
                 lcd.ellipse(x, y, r, r, color)
+        elif cmd == "arc":
+            draw_arc(lcd, *args)
         else:
             method = getattr(lcd, cmd)
             method(*args)
@@ -34,18 +151,96 @@ def execute_command(lcd, line):
         pass
 
 
+def read_exact(stream, size):
+    """Read exactly size bytes from stream."""
+    data = stream.read(size)
+    while len(data) < size:
+        data += stream.read(size - len(data))
+    return data
+
+
+def read_into(stream, view):
+    """Fill a memoryview from stream."""
+    got = 0
+    while got < len(view):
+        n = stream.readinto(view[got:])
+        if n:
+            got += n
+
+
+def blit(lcd, stream, x, y, w, h):
+    """Copy w * h RGB565 pixels from stream straight into the framebuffer."""
+    row_bytes = w * 2
+    if x < 0 or y < 0 or w <= 0 or h <= 0 or x + w > lcd.width or y + h > lcd.height:
+        # Still consume the pixels so the stream stays in sync
+        scratch = memoryview(bytearray(row_bytes)) if w > 0 else None
+        for _ in range(h if w > 0 else 0):
+            read_into(stream, scratch)
+        return
+    view = memoryview(lcd.buffer)
+    for row in range(y, y + h):
+        start = (row * lcd.width + x) * 2
+        read_into(stream, view[start:start + row_bytes])
+
+
+def execute_binary(lcd, stream, opcode):
+    """Decode one binary packet whose opcode byte was already read."""
+    entry = BINARY_COMMANDS.get(opcode)
+    if entry is None:
+        return
+    name, fmt = entry
+    size = BINARY_SIZES[opcode]
+    args = struct.unpack(fmt, read_exact(stream, size)) if size else ()
+    if name == "blit":
+        blit(lcd, stream, *args)
+        return
+    data = None
+    if name == "text":
+        length = read_exact(stream, 1)[0]
+        data = read_exact(stream, length)
+
+    try:
+        if data is not None:
+            # Inside the try: a bad byte sequence must not end the main loop
+            lcd.text(data.decode(), *args)
+        elif name == "circle":
+            x, y, r, color = args
+            lcd.ellipse(x, y, r, r, color)
+        elif name == "arc":
+            draw_arc(lcd, *args)
+        elif name == "show":
+            show(lcd)
+        else:
+            getattr(lcd, name)(*args)
+    except Exception:
+        pass
+
+
 def main():
     lcd = LCD_1inch28()
     lcd.set_bl_pwm(40000)
 
+    stream = sys.stdin.buffer
     poller = uselect.poll()
     poller.register(sys.stdin, uselect.POLLIN)
+    last_rx = time.ticks_ms()
 
     while True:
         if poller.poll(100):
-            line = sys.stdin.readline()
-            if line:
+            first = stream.read(1)
+            if not first:
+                continue
+            last_rx = time.ticks_ms()
+            if first[0] >= 0x80:
+                execute_binary(lcd, stream, first[0])
+            else:
+                try:
+                    line = (first + stream.readline()).decode()
+                except UnicodeError:
+                    continue
                 execute_command(lcd, line)
+        elif binary_session and time.ticks_diff(time.ticks_ms(), last_rx) > SESSION_IDLE_MS:
+            end_session()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+import argparse
+import io
+import json
+import os
+import signal
+import struct
+import sys
+import time
+import tty
+import zlib
+from pathlib import Path
+
+# Run the MicroPython display firmware (pc_stats/device) under CPython.
+# machine, framebuf, uselect and micropython are replaced by the stand-ins in
+# this directory, the serial link is a pseudo-terminal, and every `show` is
+# counted (commands, bytes received, SPI bytes) and can be saved as a PNG.
+#
+#   python pc_stats/emulator/emulate_device.py --png-dir /tmp/frames
+#   python pc_stats/host/pc_stats_sender.py --port /dev/pts/N
+
+EMULATOR_DIR = Path(__file__).resolve().parent
+sys.path[:0] = [str(EMULATOR_DIR), str(EMULATOR_DIR.parent / "device"), str(EMULATOR_DIR.parent / "host")]
+
+import machine  # noqa: E402  (the stand-in above)
+from raster import rgb565_to_rgb888  # noqa: E402
+
+# MicroPython's extensions to the time module
+_start = time.monotonic()
+time.ticks_ms = lambda: int((time.monotonic() - _start) * 1000)
+time.ticks_us = lambda: int((time.monotonic() - _start) * 1000000)
+time.ticks_diff = lambda new, old: new - old
+time.ticks_add = lambda ticks, delta: ticks + delta
+time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+time.sleep_us = lambda us: time.sleep(us / 1000000)
+
+
+def encode_png(rgb):
+    """Encode an (h, w, 3) uint8 array as an 8-bit RGB PNG."""
+    height, width, _ = rgb.shape
+    raw = b"".join(b"\x00" + rgb[row].tobytes() for row in range(height))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+class CountingStream:
+    """Unbuffered reader over the pty that counts the bytes the host sent."""
+
+    def __init__(self, fd):
+        self.raw = io.FileIO(fd, "rb", closefd=False)
+        self.bytes_read = 0
+
+    def fileno(self):
+        return self.raw.fileno()
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.bytes_read += len(data or b"")
+        return data
+
+    def readinto(self, view):
+        n = self.raw.readinto(view)
+        self.bytes_read += n or 0
+        return n
+
+    def readline(self):
+        line = self.raw.readline()
+        self.bytes_read += len(line)
+        return line
+
+
+class Stdin:
+    """sys.stdin stand-in: pollable, with the byte stream on ``.buffer``."""
+
+    def __init__(self, stream):
+        self.buffer = stream
+
+    def fileno(self):
+        return self.buffer.fileno()
+
+
+class DeviceEmulator:
+    def __init__(self, png_dir=None, color_order="RGB", log=None, verbose=False, show_delay=0.0):
+        self.png_dir = Path(png_dir) if png_dir else None
+        self.show_delay = show_delay
+        self.color_order = color_order
+        self.log = log
+        self.verbose = verbose
+        self.console = sys.stdout
+        self.frames = 0
+        self.commands = 0
+        self.totals = {"commands": 0, "bytes": 0, "spi_bytes": 0}
+        self.stream = None
+        self.last_bytes = 0
+        self.last_spi = 0
+        self.last_show = None
+
+    def open_pty(self, link=None):
+        """Create the pseudo-terminal; returns the port path for the sender."""
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        port = os.ttyname(self.slave)
+        if link:
+            if os.path.lexists(link):
+                os.remove(link)
+            os.symlink(port, link)
+            port = link
+        self.stream = CountingStream(self.master)
+        return port
+
+    def frame_shown(self, lcd):
+        now = time.perf_counter()
+        record = {
+            "frame": self.frames,
+            "commands": self.commands,
+            "bytes": self.stream.bytes_read - self.last_bytes,
+            "spi_bytes": machine.SPI.bytes_written - self.last_spi,
+            "interval_ms": round((now - self.last_show) * 1000, 3) if self.last_show else None,
+        }
+        for key in self.totals:
+            self.totals[key] += record[key]
+        self.frames += 1
+        self.commands = 0
+        self.last_bytes = self.stream.bytes_read
+        self.last_spi = machine.SPI.bytes_written
+        self.last_show = now
+        if self.png_dir:
+            pixels = lcd.pixels.copy()
+            path = self.png_dir / f"frame_{record['frame']:05d}.png"
+            path.write_bytes(encode_png(rgb565_to_rgb888(pixels, self.color_order)))
+        if self.log:
+            self.log.write(json.dumps(record) + "\n")
+            self.log.flush()
+        if self.verbose:
+            print(f"frame {record['frame']}: {record['commands']} commands, {record['bytes']} bytes, "
+                  f"{record['spi_bytes']} SPI bytes", file=self.console)
+
+    def install(self, display):
+        """Hook the firmware module so commands and frames are counted."""
+        emulator = self
+        lcd_class = display.LCD_1inch28
+        init, show = lcd_class.__init__, lcd_class.show
+        execute_binary, execute_command = display.execute_binary, display.execute_command
+
+        def counted_init(lcd):
+            init(lcd)
+            # Display setup traffic is not part of any frame
+            emulator.last_spi = machine.SPI.bytes_written
+
+        def counted_show(lcd):
+            show(lcd)
+            if emulator.show_delay:
+                # Stand-in for the time a slow panel or big frame keeps the device busy
+                time.sleep(emulator.show_delay)
+            emulator.frame_shown(lcd)
+
+        def counted_binary(lcd, stream, opcode):
+            emulator.commands += 1
+            execute_binary(lcd, stream, opcode)
+
+        def counted_command(lcd, line):
+            emulator.commands += 1
+            execute_command(lcd, line)
+
+        lcd_class.__init__ = counted_init
+        lcd_class.show = counted_show
+        display.execute_binary = counted_binary
+        display.execute_command = counted_command
+
+    def run(self):
+        """Run the firmware main loop until interrupted."""
+        sys.stdin = Stdin(self.stream)
+        sys.stdout = io.TextIOWrapper(io.FileIO(self.master, "wb", closefd=False), write_through=True)
+        try:
+            import pc_stats_display as display
+            self.install(display)
+            display.main()
+        finally:
+            sys.stdin = sys.__stdin__
+            sys.stdout = self.console
+
+    def summary(self):
+        frames = max(self.frames, 1)
+        return (f"{self.frames} frames, {self.totals['commands'] / frames:.1f} commands, "
+                f"{self.totals['bytes'] / frames:.0f} bytes, {self.totals['spi_bytes'] / frames:.0f} SPI bytes per frame")
+
+
+def stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulate the RP2350 display on a pseudo-terminal")
+    parser.add_argument("--png-dir", help="Save every shown frame as a PNG in this directory")
+    parser.add_argument("--log", help="Append per-frame counters to this file as JSON lines")
+    parser.add_argument("--link", help="Also expose the port under this path (symlink)")
+    parser.add_argument("--color-order", default=os.environ.get("COLOR_ORDER", "RGB"),
+                        help="COLOR_ORDER the sender packs colors with, for PNG output")
+    parser.add_argument("--show-delay-ms", type=float, default=0.0,
+                        help="Extra time each show takes, to emulate a slower device")
+    parser.add_argument("--verbose", action="store_true", help="Print counters for every frame")
+    args = parser.parse_args()
+
+    if args.png_dir:
+        Path(args.png_dir).mkdir(parents=True, exist_ok=True)
+    log = open(args.log, "a", encoding="utf-8") if args.log else None
+    emulator = DeviceEmulator(args.png_dir, args.color_order, log, args.verbose, args.show_delay_ms / 1000)
+    port = emulator.open_pty(args.link)
+    print(f"Emulated device on {port}", flush=True)
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        emulator.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if log:
+            log.close()
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+    print(emulator.summary())
+
+
+if __name__ == "__main__":
+    main()
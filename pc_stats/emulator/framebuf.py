@@ -0,0 +1,57 @@
+# CPython stand-in for the MicroPython framebuf module (see emulate_device.py)
+#
+# Only RGB565 is supported. Drawing reuses the host's NumPy Raster, which
+# follows framebuf's primitives and 8x8 font, on top of the caller's buffer.
+
+import numpy as np
+
+from raster import Raster
+
+MONO_VLSB = 0
+RGB565 = 1
+GS4_HMSB = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB = 5
+GS8 = 6
+
+
+class FrameBuffer(Raster):
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format != RGB565:
+            raise ValueError("only RGB565 frame buffers are emulated")
+        self.width = width
+        self.height = height
+        # Little-endian uint16 per pixel, shared with ``buffer``
+        self.pixels = np.frombuffer(buffer, dtype="<u2").reshape(height, width)
+
+    def pixel(self, x, y, color=None):
+        if color is None:
+            if 0 <= x < self.width and 0 <= y < self.height:
+                return int(self.pixels[y, x])
+            return None
+        super().pixel(x, y, color)
+
+    def text(self, text, x, y, color=1):
+        super().text(text, x, y, color)
+
+    def poly(self, x, y, coords, color, fill=False):
+        points = [(x + coords[i], y + coords[i + 1]) for i in range(0, len(coords) - 1, 2)]
+        if not points:
+            return
+        edges = list(zip(points, points[1:] + points[:1]))
+        if fill:
+            top = max(min(py for _, py in points), 0)
+            bottom = min(max(py for _, py in points), self.height - 1)
+            for row in range(top, bottom + 1):
+                nodes = sorted(
+                    x1 + (row - y1) * (x2 - x1) / (y2 - y1)
+                    for (x1, y1), (x2, y2) in edges
+                    if (y1 <= row < y2) or (y2 <= row < y1)
+                )
+                for left, right in zip(nodes[0::2], nodes[1::2]):
+                    start = int(round(left))
+                    self.hline(start, row, int(round(right)) - start + 1, color)
+        # Edges are drawn in both modes so thin and horizontal spans are covered
+        for (x1, y1), (x2, y2) in edges:
+            self.line(x1, y1, x2, y2, color)
@@ -0,0 +1,50 @@
+# CPython stand-in for the MicroPython machine module (see emulate_device.py)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+
+    def __init__(self, pin, mode=-1, value=None):
+        self.id = pin
+        self.mode = mode
+        self._value = value or 0
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = 1 if value else 0
+
+
+class SPI:
+    """Counts the bytes the display driver clocks out."""
+
+    # Shared across instances so the emulator can read it without a handle
+    bytes_written = 0
+
+    def __init__(self, id, baudrate=1000000, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+
+    def write(self, buf):
+        SPI.bytes_written += len(buf)
+
+
+class PWM:
+    def __init__(self, pin):
+        self.pin = pin
+        self._freq = 0
+        self._duty = 0
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = value
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
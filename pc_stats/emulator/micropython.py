@@ -0,0 +1,16 @@
+# CPython stand-in for the MicroPython micropython module (see emulate_device.py)
+
+
+def kbd_intr(chr):
+    pass
+
+
+def const(value):
+    return value
+
+
+def native(func):
+    return func
+
+
+viper = native
@@ -0,0 +1,26 @@
+# CPython stand-in for the MicroPython uselect module (see emulate_device.py)
+
+import select
+
+POLLIN = select.POLLIN
+POLLOUT = select.POLLOUT
+POLLERR = select.POLLERR
+POLLHUP = select.POLLHUP
+
+
+class poll:
+    def __init__(self):
+        self._poll = select.poll()
+        self._objects = {}
+
+    def register(self, obj, eventmask=POLLIN | POLLOUT):
+        self._objects[obj.fileno()] = obj
+        self._poll.register(obj.fileno(), eventmask)
+
+    def unregister(self, obj):
+        self._poll.unregister(obj.fileno())
+        self._objects.pop(obj.fileno(), None)
+
+    def poll(self, timeout=-1):
+        events = self._poll.poll(None if timeout < 0 else timeout)
+        return [(self._objects[fd], event) for fd, event in events]
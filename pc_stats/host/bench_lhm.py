@@ -0,0 +1,172 @@
+import argparse
+import http.server
+import json
+import statistics
+import threading
+import time
+import urllib.request
+
+from lhm import LHMClient, SensorIndex
+
+# Benchmark LHM fetching against a local stand-in for the LHM web server.
+# Serves either a recorded data.json (--tree, e.g. saved with
+# `curl http://localhost:8085/data.json -o tree.json`) or a generated tree
+# shaped like a large desktop, and compares a fresh urlopen + json.loads per
+# tick with the keep-alive, early-stopping LHMClient.
+
+_next_id = 0
+
+
+def sensor(name, value, sensor_type, sensor_id):
+    global _next_id
+    _next_id += 1
+    return {"id": _next_id, "Text": name, "Min": value, "Value": value, "Max": value,
+            "SensorId": sensor_id, "Type": sensor_type, "ImageURL": "images/transparent.png", "Children": []}
+
+
+def group(name, children):
+    global _next_id
+    _next_id += 1
+    return {"id": _next_id, "Text": name, "Min": "", "Value": "", "Max": "",
+            "ImageURL": "images_icon/folder.png", "Children": children}
+
+
+def hardware(name, prefix, counts):
+    units = {"Voltage": "V", "Temperature": "°C", "Fan": "RPM", "Control": "%", "Clock": "MHz",
+             "Load": "%", "Power": "W", "Data": "GB", "Throughput": "KB/s"}
+    groups = []
+    for sensor_type, names in counts:
+        children = [
+            sensor(label, f"{40 + i % 30}.{i % 10} {units[sensor_type]}", sensor_type,
+                   f"/{prefix}/{sensor_type.lower()}/{i}")
+            for i, label in enumerate(names)
+        ]
+        groups.append(group(sensor_type + "s", children))
+    return group(name, groups)
+
+
+def generate_tree(scale=1):
+    """Build an LHM-like tree; ``scale`` repeats the storage/network devices."""
+    cores = [f"Core #{i}" for i in range(1, 17)]
+    devices = [
+        hardware("ASUS ROG X670E", "lpc/nct6799d/0", [
+            ("Voltage", [f"Voltage #{i}" for i in range(1, 21)]),
+            ("Temperature", [f"Temperature #{i}" for i in range(1, 9)]),
+            ("Fan", ["CPU Fan"] + [f"Fan #{i}" for i in range(2, 8)]),
+            ("Control", [f"Fan Control #{i}" for i in range(1, 8)]),
+        ]),
+        hardware("AMD Ryzen 9 7950X", "amdcpu/0", [
+            ("Voltage", ["Core (SVI2 TFN)", "SoC (SVI2 TFN)"] + [f"{c} VID" for c in cores]),
+            ("Temperature", ["Core (Tctl/Tdie)", "Package", "CCD1 (Tdie)", "CCD2 (Tdie)", "CCDs Max (Tdie)",
+                             "CCDs Average (Tdie)"]),
+            ("Load", ["CPU Total", "CPU Core Max"] + [f"CPU Core #{i}" for i in range(1, 33)]),
+            ("Clock", ["Bus Speed", "Cores (Average)"] + cores),
+            ("Power", ["Package", "Core Power", "SoC Power"] + [f"{c} (SMU)" for c in cores]),
+        ]),
+        hardware("Generic Memory", "ram", [
+            ("Load", ["Memory", "Virtual Memory"]),
+            ("Data", ["Memory Used", "Memory Available", "Virtual Memory Used", "Virtual Memory Available"]),
+        ]),
+        hardware("NVIDIA GeForce RTX 4090", "gpu-nvidia/0", [
+            ("Temperature", ["GPU Core", "GPU Hot Spot", "GPU Memory Junction"]),
+            ("Clock", ["GPU Core", "GPU Memory", "GPU Shader", "GPU Video"]),
+            ("Load", ["GPU Core", "GPU Memory Controller", "GPU Video Engine", "GPU Bus", "GPU Memory",
+                      "D3D 3D", "D3D Copy", "D3D Video Decode", "D3D Video Encode"]),
+            ("Fan", ["GPU Fan 1", "GPU Fan 2"]),
+            ("Power", ["GPU Package", "GPU PCIe", "GPU 8-pin #1"]),
+            ("Throughput", ["GPU PCIe Rx", "GPU PCIe Tx"]),
+        ]),
+    ]
+    for n in range(4 * scale):
+        devices.append(hardware(f"Samsung SSD 990 PRO {n}", f"nvme/{n}", [
+            ("Temperature", ["Composite Temperature", "Temperature #1", "Temperature #2"]),
+            ("Load", ["Used Space", "Read Activity", "Write Activity", "Total Activity"]),
+            ("Data", ["Data Read", "Data Written"]),
+            ("Throughput", ["Read Rate", "Write Rate"]),
+        ]))
+    for n in range(3 * scale):
+        devices.append(hardware(f"Ethernet {n}", f"nic/{n}", [
+            ("Data", ["Data Uploaded", "Data Downloaded"]),
+            ("Throughput", ["Upload Speed", "Download Speed"]),
+            ("Load", ["Network Utilization"]),
+        ]))
+    return group("Sensor", [group("DESKTOP", devices)])
+
+
+def serve(body):
+    """Serve ``body`` as /data.json over HTTP/1.1 keep-alive; returns the URL."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; without this, Nagle plus
+        # delayed ACKs add ~40 ms to every keep-alive request
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/data.json"
+
+
+def run(name, fetch, count):
+    fetch()  # warm up (index discovery, connection setup)
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        values = fetch()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    print(f"{name:<28} mean {statistics.mean(times):7.3f} ms  p50 {times[len(times) // 2]:7.3f} ms  "
+          f"p95 {times[int(len(times) * 0.95)]:7.3f} ms")
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LHM data.json fetching")
+    parser.add_argument("--tree", help="Recorded LHM data.json to serve (default: generated tree)")
+    parser.add_argument("--scale", type=int, default=10, help="Size multiplier for the generated tree")
+    parser.add_argument("--dump", help="Write the served tree to this file")
+    parser.add_argument("--count", type=int, default=200, help="Fetches per method")
+    args = parser.parse_args()
+
+    if args.tree:
+        with open(args.tree, "rb") as handle:
+            body = handle.read()
+    else:
+        body = json.dumps(generate_tree(args.scale), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if args.dump:
+        with open(args.dump, "wb") as handle:
+            handle.write(body)
+
+    url = serve(body)
+    print(f"Serving {len(body) / 1024:.0f} KB tree at {url}")
+
+    index = SensorIndex()
+
+    def urlopen_fetch():
+        with urllib.request.urlopen(url, timeout=2) as response:
+            data = json.loads(response.read().decode("utf-8"))
+        return index.read(data)
+
+    client = LHMClient(url, SensorIndex())
+
+    baseline = run("urlopen + json.loads", urlopen_fetch, args.count)
+    streamed = run("keep-alive + early stop", client.read, args.count)
+    print(f"Early stops: {client.early_stops}")
+    if baseline != streamed:
+        print(f"WARNING: results differ: {baseline} vs {streamed}")
+    else:
+        print(f"Values: {streamed}")
+
+
+if __name__ == "__main__":
+    main()
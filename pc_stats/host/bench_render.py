@@ -0,0 +1,225 @@
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import time
+import timeit
+
+import pc_stats_sender as sender
+from history import StatHistory, lttb
+from protocol import ENCODERS, FrameBuilder
+from raster import RasterScene
+from scene import CommandRecorder, Scene
+from stats_trace import StatsReplay
+
+# Benchmark the host render path without a device. Every layout is drawn
+# with synthetic stats, or the samples of a recorded stats trace, into a
+# counting serial object for each wire protocol and render mode, and a few
+# hot helpers are timed on their own.
+#
+#   python pc_stats/host/bench_render.py --output bench.json
+#   python pc_stats/host/bench_render.py --baseline bench.json
+#   python pc_stats/host/bench_render.py --stats game.pcst
+
+SERIAL_BAUD = 115200
+# Bytes per second a USB full-speed CDC link sustains in practice
+USB_CDC_BYTES_PER_SEC = 1_000_000
+
+# (protocol, device caps, render mode)
+CONFIGS = [
+    ("csv", (), "full"),
+    ("csv", (), "incremental"),
+    ("binary", ("blit", "arc"), "full"),
+    ("binary", ("blit", "arc"), "incremental"),
+    ("binary", ("blit", "arc"), "raster"),
+]
+
+
+class CountingSerial:
+    """Serial stand-in that only counts what is written."""
+
+    def __init__(self):
+        self.bytes_written = 0
+        self.writes = 0
+
+    def write(self, data):
+        self.bytes_written += len(data)
+        self.writes += 1
+        return len(data)
+
+
+def synthetic_stats(rng, count):
+    """Yield ``count`` stats dicts shaped like StatsCollector.snapshot() output."""
+    stats = {
+        "cpu_temp_c": 55.0, "cpu_power_w": 90.0, "cpu_clock_mhz": 4500.0, "cpu_fan_rpm": 1200.0,
+        "cpu_load": 30.0, "ram_used_mb": 14000.0, "ram_total_mb": 32768.0,
+        "fps": 144.0, "fps_low": 110.0, "frametime_p50_ms": 6.9, "frametime_p95_ms": 8.1, "frametime_p99_ms": 9.0,
+    }
+    for metric, value in (("temp_c", 65.0), ("load", 80.0), ("mem_used_mb", 8000.0),
+                          ("mem_total_mb", 24576.0), ("power_w", 250.0), ("mem_temp_c", 70.0)):
+        stats[f"gpu_{metric}"] = stats[f"gpu0_{metric}"] = value
+    for _ in range(count):
+        # Random walk so consecutive frames differ like real readings do
+        stats = {key: max(0.0, value + rng.uniform(-1, 1) * max(value * 0.02, 1.0)) for key, value in stats.items()}
+        yield stats
+
+
+def trace_stats(path, count):
+    """Return ``count`` ``(time, stats)`` samples from a trace, starting over as needed."""
+    samples = list(StatsReplay(path))
+    span = samples[-1][0] + 1.0
+    return [(samples[i % len(samples)][0] + span * (i // len(samples)), samples[i % len(samples)][1])
+            for i in range(count)]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def bench_layout(layout, protocol, caps, render, samples):
+    # Graphs read this history, fed one sample per frame
+    history = StatHistory(sender.HISTORY_SIZE)
+    plan = sender.RenderPlan(layout, history)
+    ser = CountingSerial()
+    frame = FrameBuilder(ser, ENCODERS[protocol], caps, skip_unchanged=True)
+    scene = Scene(sender.COLOR_BG)
+    raster_scene = RasterScene()
+    times, sizes, commands = [], [], []
+    unchanged = 0
+    for t, stats in samples:
+        history.record(stats, t)
+        before = ser.bytes_written
+        start = time.perf_counter()
+        if render == "full":
+            sender.draw_layout(frame, plan, stats)
+            sent = True
+        elif render == "raster":
+            sent = sender.draw_layout_raster(frame, raster_scene, plan, stats)
+        else:
+            sent = sender.draw_layout_incremental(frame, scene, plan, stats)
+        # The scenes drop an unchanged frame themselves, the builder's fingerprint catches the rest
+        sent = sent and not frame.last_frame_skipped
+        unchanged += not sent
+        times.append((time.perf_counter() - start) * 1e6)
+        sizes.append(ser.bytes_written - before)
+        commands.append(frame.last_frame_commands if sent else 0)
+    # The first frame is always a full redraw; report it separately
+    steady = sizes[1:] or sizes
+    mean_bytes = statistics.mean(steady)
+    return {
+        "first_frame_bytes": sizes[0],
+        "commands_per_frame": statistics.mean(commands[1:] or commands),
+        "bytes_per_frame": mean_bytes,
+        "frames_unchanged": unchanged,
+        "cpu_us_mean": statistics.mean(times),
+        "cpu_us_p95": percentile(times, 95),
+        "transfer_ms_serial": mean_bytes * 10 / SERIAL_BAUD * 1000,
+        "transfer_ms_usb": mean_bytes / USB_CDC_BYTES_PER_SEC * 1000,
+    }
+
+
+def time_call(func, repeat=5):
+    """Best-of-``repeat`` time per call in microseconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def bench_micro():
+    recorder = CommandRecorder()
+    frame = FrameBuilder(CountingSerial(), ENCODERS["binary"], ("arc",))
+    csv_frame = FrameBuilder(CountingSerial(), ENCODERS["csv"])
+    ys = range(0, sender.SCREEN_HEIGHT, 8)
+    xs = [float(i) for i in range(300)]
+    samples = [math.sin(i / 10) for i in range(300)]
+
+    def draw_arc():
+        recorder.commands.clear()
+        sender.draw_arc(recorder, 120, 120, 40, 135, -135, sender.COLOR_GRAY, thickness=15)
+
+    def send_command(target):
+        sender.send_command(target, "text", "CPU T: 55C", 32, 39, 0)
+        target.length = target.commands = 0
+
+    return {
+        "draw_arc_gauge_us": time_call(draw_arc),
+        "circle_text_span_row_us": time_call(lambda: [sender.circle_text_span(y) for y in ys]) / len(ys),
+        "text_span_lut_row_us": time_call(lambda: [sender.text_span(y) for y in ys]) / len(ys),
+        "interpolate_color_us": time_call(lambda: sender.interpolate_color(63.0, 30, 90)),
+        "gradient_color_us": time_call(lambda: sender.gradient_color(0.55)),
+        "lttb_300_to_48_us": time_call(lambda: lttb(xs, samples, 48)),
+        "send_command_binary_us": time_call(lambda: send_command(frame)),
+        "send_command_csv_us": time_call(lambda: send_command(csv_frame)),
+    }
+
+
+def run(frames, seed, trace=None):
+    if trace:
+        samples = trace_stats(trace, frames)
+    else:
+        # One sample per frame at a 1 s interval
+        samples = [(float(i), stats) for i, stats in enumerate(synthetic_stats(random.Random(seed), frames))]
+    layouts = {}
+    for layout in sender.LAYOUTS:
+        for protocol, caps, render in CONFIGS:
+            layouts[f"{layout['name']}/{protocol}/{render}"] = bench_layout(layout, protocol, caps, render, samples)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "frames": frames,
+            "seed": seed,
+            "stats": trace or "synthetic",
+        },
+        "layouts": layouts,
+        "micro": bench_micro(),
+    }
+
+
+def change(value, base):
+    if not base:
+        return ""
+    pct = (value - base) / base * 100
+    return f" ({pct:+.0f}%)" if math.isfinite(pct) else ""
+
+
+def report(results, baseline=None):
+    base_layouts = (baseline or {}).get("layouts", {})
+    print(f"{'layout/protocol/render':<42} {'cmds':>7} {'bytes':>14} {'cpu us':>16} {'115200 ms':>10} {'usb ms':>7}")
+    for name, row in results["layouts"].items():
+        base = base_layouts.get(name, {})
+        print(f"{name:<42} {row['commands_per_frame']:7.1f} "
+              f"{row['bytes_per_frame']:8.0f}{change(row['bytes_per_frame'], base.get('bytes_per_frame')):>6} "
+              f"{row['cpu_us_mean']:9.1f}{change(row['cpu_us_mean'], base.get('cpu_us_mean')):>7} "
+              f"{row['transfer_ms_serial']:10.2f} {row['transfer_ms_usb']:7.3f}")
+    base_micro = (baseline or {}).get("micro", {})
+    print()
+    for name, value in results["micro"].items():
+        print(f"{name:<42} {value:9.3f} us{change(value, base_micro.get(name))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark host-side layout rendering")
+    parser.add_argument("--frames", type=int, default=200, help="Frames per layout and mode")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the synthetic stats")
+    parser.add_argument("--stats", help="Use a trace recorded with pc_stats_sender.py --record-stats")
+    parser.add_argument("--output", help="Save results as JSON")
+    parser.add_argument("--baseline", help="Compare against results saved with --output")
+    args = parser.parse_args()
+
+    results = run(args.frames, args.seed, args.stats)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    report(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Command-stream capture
+#
+# The sender's --record option writes every chunk of encoded commands exactly
+# as it goes to the serial port, so replay_capture.py can send a device the
+# same traffic again. The file is written sequentially and never rewritten:
+#
+#   magic "PCSC", version (u8)
+#   records: kind (u8), stream (u8), time (f64 seconds since the capture
+#            started), length (u32), payload
+#
+# A STREAM record (JSON with port, protocol and caps) comes before the first
+# FRAME record of each display; FRAME payloads are the bytes written.
+
+import json
+import struct
+import threading
+import time
+
+CAPTURE_MAGIC = b"PCSC"
+CAPTURE_VERSION = 1
+RECORD = struct.Struct("<BBdI")
+KIND_STREAM = 0
+KIND_FRAME = 1
+
+
+class FrameRecorder:
+    """Append records to a capture file; safe to use from several writer threads."""
+
+    def __init__(self, path, clock=time.monotonic):
+        self.clock = clock
+        self.handle = open(path, "wb")
+        self.handle.write(CAPTURE_MAGIC + bytes((CAPTURE_VERSION,)))
+        self.start = clock()
+        self.streams = 0
+        self.frames = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def _write(self, kind, stream, payload):
+        header = RECORD.pack(kind, stream, self.clock() - self.start, len(payload))
+        with self._lock:
+            self.handle.write(header)
+            self.handle.write(payload)
+            # Keep the file complete up to the last record if the sender is killed
+            self.handle.flush()
+
+    def add_stream(self, port, protocol, caps):
+        """Describe one display's stream; returns the id to pass to ``frame``."""
+        stream = self.streams
+        self.streams += 1
+        info = {"port": port, "protocol": protocol, "caps": sorted(caps)}
+        self._write(KIND_STREAM, stream, json.dumps(info).encode("utf-8"))
+        return stream
+
+    def frame(self, stream, data):
+        self._write(KIND_FRAME, stream, data)
+        self.frames += 1
+        self.bytes += len(data)
+
+    def close(self):
+        with self._lock:
+            self.handle.close()
+
+
+def read_capture(path):
+    """Yield ``(kind, stream, time, payload)``; STREAM payloads are decoded to dicts."""
+    with open(path, "rb") as handle:
+        head = handle.read(len(CAPTURE_MAGIC) + 1)
+        if head[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC or head[-1] != CAPTURE_VERSION:
+            raise ValueError(f"{path} is not a version {CAPTURE_VERSION} capture")
+        while True:
+            header = handle.read(RECORD.size)
+            if len(header) < RECORD.size:
+                # A capture cut off mid-record (sender killed) ends here
+                return
+            kind, stream, t, length = RECORD.unpack(header)
+            payload = handle.read(length)
+            if len(payload) < length:
+                return
+            if kind == KIND_STREAM:
+                payload = json.loads(payload)
+            yield kind, stream, t, payload
@@ -0,0 +1,131 @@
+# Concurrent stats collection
+#
+# Every stats source (LHM over HTTP, PresentMon, NVML, psutil) runs on its
+# own worker thread. The render loop takes a snapshot of the latest completed
+# sample of each source and never waits for a slow one; values older than the
+# source's stale threshold are reported as missing.
+
+import threading
+import time
+
+
+class StatSource:
+    """Poll one stats source on a background thread, keeping its latest sample.
+
+    ``read`` returns a dict with (a subset of) ``keys``. ``deadline`` is how
+    long a single read is expected to take; slower reads are counted in
+    ``overruns`` but their result is still used. A sample older than
+    ``stale_after`` seconds is treated as missing.
+    """
+
+    def __init__(self, name, read, keys, period=1.0, deadline=None, stale_after=None):
+        self.name = name
+        self.read = read
+        self.keys = list(keys)
+        self.period = period
+        self.deadline = deadline if deadline is not None else period
+        self.stale_after = stale_after if stale_after is not None else 3 * max(period, self.deadline)
+        self.values = {key: None for key in self.keys}
+        self.updated = None
+        self.duration = None
+        self.overruns = 0
+        self.errors = 0
+        # StatHistory the samples are also appended to and StageTimers the
+        # read times go to (both set by StatsCollector)
+        self.history = None
+        self.timers = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        """Take one sample synchronously."""
+        started = time.monotonic()
+        try:
+            values = self.read()
+        except Exception as e:
+            print(f"DEBUG: {self.name} source error: {e}")
+            self.errors += 1
+            values = None
+        finished = time.monotonic()
+        self.duration = finished - started
+        if self.duration > self.deadline:
+            self.overruns += 1
+        if self.timers is not None:
+            self.timers.add(f"source/{self.name}", self.duration)
+        if values is not None:
+            with self._lock:
+                self.values = {key: values.get(key) for key in self.keys}
+                self.updated = finished
+            if self.history is not None:
+                self.history.record(self.values, finished)
+
+    def latest(self, now=None):
+        """Return ``(values, stale)`` for the most recent sample."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            values, updated = self.values, self.updated
+        stale = updated is None or now - updated > self.stale_after
+        return values, stale
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"stats-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            self.run_once()
+            next_run += self.period
+            now = time.monotonic()
+            if next_run < now:
+                # The read took longer than the period; start again right away
+                next_run = now
+            self._stop.wait(next_run - now)
+
+
+class StatsCollector:
+    """Merge the latest samples of several StatSource workers.
+
+    With a ``history`` every sample is also appended to its ring buffers;
+    with ``timers`` every read is timed as stage ``source/<name>``.
+    """
+
+    def __init__(self, sources, history=None, timers=None):
+        self.sources = list(sources)
+        self.history = history
+        for source in self.sources:
+            source.history = history
+            source.timers = timers
+        self.stale = []
+
+    def start(self):
+        for source in self.sources:
+            source.start()
+
+    def stop(self):
+        for source in self.sources:
+            source.stop()
+
+    def snapshot(self):
+        """Return the latest values of every source merged into one dict; stale values are None.
+
+        The names of the sources that were stale are kept in ``self.stale``.
+        """
+        now = time.monotonic()
+        stats = {}
+        stale = []
+        for source in self.sources:
+            values, is_stale = source.latest(now)
+            if is_stale:
+                stale.append(source.name)
+                stats.update({key: None for key in source.keys})
+            else:
+                stats.update(values)
+        self.stale = stale
+        return stats
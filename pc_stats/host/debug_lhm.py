@@ -1,15 +1,23 @@
+import argparse
 import json
 import urllib.request
 from pathlib import Path
 from dotenv import load_dotenv
 import os
 
+from lhm import SensorIndex
+
 # Load .env
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path)
 
 LHM_URL = os.environ.get("LHM_URL", "")
 
+parser = argparse.ArgumentParser(description="List LibreHardwareMonitor temperature sensors")
+parser.add_argument("--export", metavar="FILE",
+                    help="Also save the sensor index the sender would build (e.g. pc_stats/lhm_index.json)")
+args = parser.parse_args()
+
 if not LHM_URL:
     print("LHM_URL not set in .env")
     exit(1)
@@ -39,6 +47,20 @@ try:
     
     print("Temperature sensors found:")
     print_temps(data)
+
+    if args.export:
+        index = SensorIndex()
+        index.discover(data)
+        print("\nSensor index:")
+        values = index.read(data)
+        for key in index.specs:
+            entry = index.entries.get(key)
+            if entry is None:
+                print(f"  {key}: not found")
+            else:
+                print(f"  {key}: {entry['text']} ({entry['sensor_id'] or 'no SensorId'}) = {values[key]}")
+        index.save(args.export)
+        print(f"\nSaved to {args.export}")
     
 except Exception as e:
     print(f"Error: {e}")
@@ -0,0 +1,40 @@
+import argparse
+import random
+import sys
+import time
+
+# Stand-in for PresentMon that prints canned CSV to stdout, so the streaming
+# reader can be exercised without Windows or a running game. PresentMon's own
+# flags (-process_name, -output_stdout, ...) are accepted and ignored.
+
+HEADER = ("Application,ProcessID,SwapChainAddress,Runtime,SyncInterval,PresentFlags,Dropped,"
+          "TimeInSeconds,msInPresentAPI,msBetweenPresents,AllowsTearing,PresentMode,"
+          "msUntilRenderComplete,msUntilDisplayed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake PresentMon CSV output")
+    parser.add_argument("--fps", type=float, default=120.0, help="Average frame rate to emit")
+    parser.add_argument("--jitter", type=float, default=0.15, help="Relative frame time jitter")
+    parser.add_argument("--stutter", type=float, default=0.01, help="Fraction of frames that take 4x longer")
+    parser.add_argument("--duration", type=float, default=0.0, help="Seconds to run (0 = forever)")
+    args, _ = parser.parse_known_args()
+
+    print(HEADER, flush=True)
+    start = time.monotonic()
+    elapsed = 0.0
+    while not args.duration or elapsed < args.duration:
+        frametime = 1000.0 / args.fps * random.uniform(1 - args.jitter, 1 + args.jitter)
+        if random.random() < args.stutter:
+            frametime *= 4
+        elapsed += frametime / 1000.0
+        delay = start + elapsed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        sys.stdout.write(f"Game.exe,1234,0x0,DXGI,0,0,0,{elapsed:.6f},0.1,{frametime:.3f},1,"
+                         f"Hardware: Independent Flip,{frametime * 0.8:.3f},{frametime:.3f}\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
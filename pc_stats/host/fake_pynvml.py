@@ -0,0 +1,143 @@
+# Stand-in for pynvml so the sender can run on machines without an NVIDIA GPU
+#
+# Selected by setting FAKE_NVML=1 (FAKE_NVML_GPUS sets the GPU count, default
+# 2). Values drift slowly over time so gauges move.
+
+import ctypes
+import math
+import os
+import time
+
+NVML_SUCCESS = 0
+NVML_ERROR_NOT_SUPPORTED = 3
+NVML_TEMPERATURE_GPU = 0
+
+NVML_VALUE_TYPE_DOUBLE = 0
+NVML_VALUE_TYPE_UNSIGNED_INT = 1
+NVML_VALUE_TYPE_UNSIGNED_LONG = 2
+NVML_VALUE_TYPE_UNSIGNED_LONG_LONG = 3
+
+NVML_FI_DEV_MEMORY_TEMP = 82
+NVML_FI_DEV_POWER_INSTANT = 186
+
+GPU_COUNT = int(os.environ.get("FAKE_NVML_GPUS", "2"))
+MEMORY_TOTAL = (24 * 1024, 12 * 1024, 8 * 1024, 16 * 1024)
+
+_initialised = False
+
+
+class NVMLError(Exception):
+    pass
+
+
+class c_nvmlValue_t(ctypes.Union):
+    _fields_ = [
+        ("dVal", ctypes.c_double),
+        ("uiVal", ctypes.c_uint),
+        ("ulVal", ctypes.c_ulong),
+        ("ullVal", ctypes.c_ulonglong),
+        ("sllVal", ctypes.c_longlong),
+        ("siVal", ctypes.c_int),
+        ("usVal", ctypes.c_ushort),
+    ]
+
+
+class c_nvmlFieldValue_t(ctypes.Structure):
+    _fields_ = [
+        ("fieldId", ctypes.c_uint32),
+        ("scopeId", ctypes.c_uint32),
+        ("timestamp", ctypes.c_int64),
+        ("latencyUsec", ctypes.c_int64),
+        ("valueType", ctypes.c_uint32),
+        ("nvmlReturn", ctypes.c_uint32),
+        ("value", c_nvmlValue_t),
+    ]
+
+
+class _Utilization:
+    def __init__(self, gpu, memory):
+        self.gpu = gpu
+        self.memory = memory
+
+
+class _Memory:
+    def __init__(self, total, used):
+        self.total = total
+        self.used = used
+        self.free = total - used
+
+
+def _wave(index, period, low, high):
+    phase = time.monotonic() / period + index * 1.7
+    return low + (high - low) * (0.5 + 0.5 * math.sin(phase))
+
+
+def _check(handle=None):
+    if not _initialised:
+        raise NVMLError("NVML not initialised")
+    if handle is not None and not 0 <= handle < GPU_COUNT:
+        raise NVMLError("Invalid argument")
+
+
+def nvmlInit():
+    global _initialised
+    _initialised = True
+
+
+def nvmlShutdown():
+    global _initialised
+    _initialised = False
+
+
+def nvmlDeviceGetCount():
+    _check()
+    return GPU_COUNT
+
+
+def nvmlDeviceGetHandleByIndex(index):
+    _check(index)
+    return index
+
+
+def nvmlDeviceGetName(handle):
+    _check(handle)
+    return f"Fake GPU {handle}"
+
+
+def nvmlDeviceGetTemperature(handle, sensor):
+    _check(handle)
+    return int(_wave(handle, 20.0, 40, 80))
+
+
+def nvmlDeviceGetUtilizationRates(handle):
+    _check(handle)
+    return _Utilization(int(_wave(handle, 7.0, 0, 100)), int(_wave(handle, 11.0, 0, 100)))
+
+
+def nvmlDeviceGetMemoryInfo(handle):
+    _check(handle)
+    total = MEMORY_TOTAL[handle % len(MEMORY_TOTAL)] * 1024 * 1024
+    return _Memory(total, int(total * _wave(handle, 30.0, 0.1, 0.9)))
+
+
+def nvmlDeviceGetPowerUsage(handle):
+    _check(handle)
+    return int(_wave(handle, 5.0, 30, 350) * 1000)
+
+
+def nvmlDeviceGetFieldValues(handle, fieldIds):
+    _check(handle)
+    values = (c_nvmlFieldValue_t * len(fieldIds))()
+    for i, field_id in enumerate(fieldIds):
+        value = values[i]
+        value.fieldId = field_id
+        value.timestamp = int(time.time() * 1e6)
+        if field_id == NVML_FI_DEV_POWER_INSTANT:
+            value.valueType = NVML_VALUE_TYPE_UNSIGNED_INT
+            value.value.uiVal = nvmlDeviceGetPowerUsage(handle)
+        elif field_id == NVML_FI_DEV_MEMORY_TEMP:
+            value.valueType = NVML_VALUE_TYPE_UNSIGNED_INT
+            value.value.uiVal = int(_wave(handle, 25.0, 50, 90))
+        else:
+            value.nvmlReturn = NVML_ERROR_NOT_SUPPORTED
+    return values
@@ -0,0 +1,139 @@
+# NVIDIA GPU stats via NVML
+#
+# All GPUs are enumerated once at startup. Every metric that NVML exposes as a
+# field ID is read for each GPU with a single nvmlDeviceGetFieldValues call,
+# and its dedicated getter is only called when that field comes back with an
+# error. NVML has no field IDs for GPU temperature, utilization or memory, so
+# those keep their dedicated calls. Stats are reported per GPU as
+# gpu<N>_<metric>, and GPU 0 is also reported under the plain gpu_<metric>
+# keys used by the layouts.
+
+GPU_METRICS = ("temp_c", "load", "mem_used_mb", "mem_total_mb", "power_w", "mem_temp_c")
+
+# Metric -> (NVML field ID constant, scale to the reported unit, name of the
+# dedicated getter taking a handle, or None)
+FIELD_METRICS = {
+    "power_w": ("NVML_FI_DEV_POWER_INSTANT", 0.001, "nvmlDeviceGetPowerUsage"),   # milliwatts
+    "mem_temp_c": ("NVML_FI_DEV_MEMORY_TEMP", 1.0, None),
+}
+NVML_ERROR_NOT_SUPPORTED = 3
+
+
+def field_value(field):
+    """Extract the number from an nvmlFieldValue_t, or None on error."""
+    if field.nvmlReturn != 0:
+        return None
+    value_type = field.valueType
+    value = field.value
+    if value_type == 0:
+        return float(value.dVal)
+    if value_type == 1:
+        return float(value.uiVal)
+    if value_type == 2:
+        return float(value.ulVal)
+    if value_type == 3:
+        return float(value.ullVal)
+    if value_type == 4:
+        return float(value.sllVal)
+    if value_type == 5:
+        return float(value.siVal)
+    if value_type == 6:
+        return float(value.usVal)
+    return None
+
+
+class GpuReader:
+    """Read every GPU on the system with as few NVML calls as possible.
+
+    ``nvml`` is the pynvml module (or a stand-in with the same API).
+    """
+
+    def __init__(self, nvml):
+        self.nvml = nvml
+        self.handles = []
+        self.names = []
+        # Per GPU: metric -> field ID still read through nvmlDeviceGetFieldValues
+        self.fields = []
+
+    def start(self):
+        """Initialise NVML and enumerate GPUs; returns the GPU count."""
+        try:
+            self.nvml.nvmlInit()
+            count = self.nvml.nvmlDeviceGetCount()
+            self.handles = [self.nvml.nvmlDeviceGetHandleByIndex(i) for i in range(count)]
+        except Exception as e:
+            print(f"DEBUG: NVML unavailable: {e}")
+            self.handles = []
+        self.names = []
+        for handle in self.handles:
+            try:
+                name = self.nvml.nvmlDeviceGetName(handle)
+            except Exception:
+                name = "GPU"
+            self.names.append(name.decode() if isinstance(name, bytes) else name)
+        # Field IDs this pynvml knows about; ones a GPU does not support are
+        # dropped for that GPU on first read
+        fields = {}
+        if hasattr(self.nvml, "nvmlDeviceGetFieldValues"):
+            for metric, (constant, _, _) in FIELD_METRICS.items():
+                field_id = getattr(self.nvml, constant, None)
+                if field_id is not None:
+                    fields[metric] = field_id
+        self.fields = [dict(fields) for _ in self.handles]
+        return len(self.handles)
+
+    def keys(self):
+        keys = [f"gpu_{metric}" for metric in GPU_METRICS]
+        for i in range(len(self.handles)):
+            keys.extend(f"gpu{i}_{metric}" for metric in GPU_METRICS)
+        return keys
+
+    def read_gpu(self, index):
+        nvml = self.nvml
+        handle = self.handles[index]
+        fields = self.fields[index]
+        values = dict.fromkeys(GPU_METRICS)
+        try:
+            values["temp_c"] = float(nvml.nvmlDeviceGetTemperature(handle, nvml.NVML_TEMPERATURE_GPU))
+            values["load"] = float(nvml.nvmlDeviceGetUtilizationRates(handle).gpu)
+            mem = nvml.nvmlDeviceGetMemoryInfo(handle)
+            values["mem_used_mb"] = float(mem.used) / (1024 * 1024)
+            values["mem_total_mb"] = float(mem.total) / (1024 * 1024)
+        except Exception:
+            pass
+        failed = [metric for metric in FIELD_METRICS if metric not in fields]
+        if fields:
+            metrics = list(fields)
+            try:
+                results = nvml.nvmlDeviceGetFieldValues(handle, [fields[metric] for metric in metrics])
+            except Exception:
+                # Old driver without field value support
+                fields.clear()
+                results = []
+                failed = list(FIELD_METRICS)
+            for metric, result in zip(metrics, results):
+                value = field_value(result)
+                if value is not None:
+                    values[metric] = value * FIELD_METRICS[metric][1]
+                    continue
+                failed.append(metric)
+                if result.nvmlReturn == NVML_ERROR_NOT_SUPPORTED:
+                    del fields[metric]
+        for metric in failed:
+            _, scale, getter = FIELD_METRICS[metric]
+            if getter is None:
+                continue
+            try:
+                values[metric] = getattr(nvml, getter)(handle) * scale
+            except Exception:
+                pass
+        return values
+
+    def read(self):
+        stats = {key: None for key in self.keys()}
+        for i in range(len(self.handles)):
+            for metric, value in self.read_gpu(i).items():
+                stats[f"gpu{i}_{metric}"] = value
+                if i == 0:
+                    stats[f"gpu_{metric}"] = value
+        return stats
@@ -0,0 +1,112 @@
+# Rolling per-stat history
+#
+# Each stat gets a fixed-capacity ring buffer of array('d') timestamps and
+# array('f') values, so memory stays constant however long the sender runs.
+# Graph widgets read the last N seconds and decimate them with
+# Largest-Triangle-Three-Buckets (LTTB), which keeps the peaks and dips that
+# plain striding would drop.
+
+import threading
+from array import array
+
+
+class RingBuffer:
+    """Fixed number of (time, value) samples; the oldest are overwritten."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("f", bytes(4 * capacity))
+        self.head = 0  # next slot to write
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, t, value):
+        i = self.head
+        self.times[i] = t
+        self.values[i] = value
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def latest_time(self):
+        if not self.count:
+            return None
+        return self.times[(self.head - 1) % self.capacity]
+
+    def since(self, start):
+        """Return ``(times, values)`` for samples at or after ``start``, oldest first."""
+        times, values = [], []
+        head, count, capacity = self.head, self.count, self.capacity
+        for k in range(1, count + 1):
+            i = (head - k) % capacity
+            t = self.times[i]
+            if t < start:
+                break
+            times.append(t)
+            values.append(self.values[i])
+        times.reverse()
+        values.reverse()
+        return times, values
+
+
+class StatHistory:
+    """One RingBuffer per stat key, created on first use."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.buffers = {}
+        self._lock = threading.Lock()
+
+    def record(self, values, t):
+        """Append every numeric value in ``values`` sampled at time ``t``."""
+        for key, value in values.items():
+            if not isinstance(value, (int, float)):
+                continue
+            buffer = self.buffers.get(key)
+            if buffer is None:
+                with self._lock:
+                    buffer = self.buffers.setdefault(key, RingBuffer(self.capacity))
+            buffer.append(t, value)
+
+    def window(self, key, seconds):
+        """Return ``(times, values)`` for the last ``seconds`` before the newest sample."""
+        buffer = self.buffers.get(key)
+        latest = buffer.latest_time() if buffer is not None else None
+        if latest is None:
+            return [], []
+        return buffer.since(latest - seconds)
+
+
+def lttb(xs, ys, threshold):
+    """Downsample to ``threshold`` points with Largest-Triangle-Three-Buckets."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(xs), list(ys)
+    out_x, out_y = [xs[0]], [ys[0]]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle corner
+        next_start = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        a = best
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
@@ -0,0 +1,177 @@
+# Persistent stat history
+#
+# Every stat gets one fixed-size file, memory-mapped with NumPy, holding
+# several ring tiers at decreasing resolution (1 s for an hour, 10 s for a
+# day, 1 min for a week). Slots are addressed by time bucket, so a sample is
+# a 12-byte write per tier and nothing is ever appended or compacted. The
+# slot for the current bucket holds the running mean of its samples.
+#
+# The store has the same record/window interface as StatHistory, so graph
+# widgets can read from either; after a restart they show the saved history
+# straight away.
+
+import os
+import threading
+import time
+
+import numpy as np
+
+STORE_MAGIC = b"PCTS"
+STORE_VERSION = 1
+# (seconds per slot, slots) for each tier
+TIERS = ((1, 3600), (10, 8640), (60, 10080))
+HEADER_DTYPE = np.dtype([("magic", "S4"), ("version", "<u4"), ("tiers", "<u4"), ("reserved", "<u4")])
+TIER_DTYPE = np.dtype([("resolution", "<f8"), ("slots", "<i8")])
+
+
+class Tier:
+    """One ring of (bucket, value) slots; ``buckets`` and ``values`` are views of the mapping."""
+
+    def __init__(self, resolution, buckets, values):
+        self.resolution = resolution
+        self.slots = len(buckets)
+        self.buckets = buckets
+        self.values = values
+        newest = int(buckets.max())
+        self.newest = newest if newest > 0 else None
+        # Running mean of the current bucket; a partial bucket is restarted after a restart
+        self.bucket = None
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, t, value):
+        bucket = int(t // self.resolution)
+        if bucket != self.bucket:
+            self.bucket, self.total, self.count = bucket, 0.0, 0
+        self.total += value
+        self.count += 1
+        slot = bucket % self.slots
+        self.values[slot] = self.total / self.count
+        self.buckets[slot] = bucket
+        if self.newest is None or bucket > self.newest:
+            self.newest = bucket
+
+    def span(self):
+        return self.resolution * self.slots
+
+    def window(self, seconds):
+        """Return ``(bucket start times, values)`` for the last ``seconds``, oldest first.
+
+        ``values`` is a view of the mapping, so it changes with later samples,
+        unless the window wraps past the end of the ring or takes in slots
+        left from an earlier run; then it is a copy. The times are always a
+        new array.
+        """
+        if self.newest is None:
+            return np.empty(0), np.empty(0, np.float32)
+        first = max(self.newest - int(seconds // self.resolution), self.newest - self.slots + 1)
+        start, end = first % self.slots, self.newest % self.slots
+        if start <= end:
+            buckets, values = self.buckets[start:end + 1], self.values[start:end + 1]
+        else:
+            buckets = np.concatenate((self.buckets[start:], self.buckets[:end + 1]))
+            values = np.concatenate((self.values[start:], self.values[:end + 1]))
+        keep = buckets >= first
+        if not keep.all():
+            # Slots not written since an earlier run still hold older buckets
+            buckets, values = buckets[keep], values[keep]
+        return buckets * self.resolution, values
+
+
+class SeriesFile:
+    """The memory-mapped tier file of one stat."""
+
+    def __init__(self, path, tiers=TIERS):
+        self.path = path
+        size = HEADER_DTYPE.itemsize + TIER_DTYPE.itemsize * len(tiers) + sum(12 * slots for _, slots in tiers)
+        mode = "r+" if self.matches(path, tiers, size) else "w+"
+        self.map = np.memmap(path, np.uint8, mode, shape=(size,))
+        if mode == "w+":
+            header = self.map[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+            header[0] = (STORE_MAGIC, STORE_VERSION, len(tiers), 0)
+        table = self.map[HEADER_DTYPE.itemsize:HEADER_DTYPE.itemsize + TIER_DTYPE.itemsize * len(tiers)].view(TIER_DTYPE)
+        offset = HEADER_DTYPE.itemsize + TIER_DTYPE.itemsize * len(tiers)
+        self.tiers = []
+        for i, (resolution, slots) in enumerate(tiers):
+            if mode == "w+":
+                table[i] = (resolution, slots)
+            buckets = self.map[offset:offset + 8 * slots].view("<i8")
+            offset += 8 * slots
+            values = self.map[offset:offset + 4 * slots].view("<f4")
+            offset += 4 * slots
+            self.tiers.append(Tier(resolution, buckets, values))
+
+    @staticmethod
+    def matches(path, tiers, size):
+        """True if ``path`` is a store file with this tier layout."""
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            return False
+        with open(path, "rb") as handle:
+            header = np.frombuffer(handle.read(HEADER_DTYPE.itemsize), HEADER_DTYPE)[0]
+            table = np.frombuffer(handle.read(TIER_DTYPE.itemsize * len(tiers)), TIER_DTYPE)
+        return (header["magic"] == STORE_MAGIC and header["version"] == STORE_VERSION
+                and [tuple(row) for row in table.tolist()] == [(float(r), s) for r, s in tiers])
+
+    def add(self, t, value):
+        for tier in self.tiers:
+            tier.add(t, value)
+
+    def window(self, seconds):
+        # Finest tier that reaches back far enough, else the longest one
+        for tier in self.tiers:
+            if tier.span() >= seconds:
+                return tier.window(seconds)
+        return self.tiers[-1].window(seconds)
+
+
+class HistoryStore:
+    """StatHistory replacement backed by one SeriesFile per stat in ``directory``.
+
+    ``record`` and ``window`` take and return monotonic times like
+    StatHistory; the files hold wall-clock buckets so they stay valid across
+    restarts.
+    """
+
+    def __init__(self, directory, tiers=TIERS):
+        self.directory = directory
+        self.tier_layout = tiers
+        self.series = {}
+        self._lock = threading.Lock()
+        # Wall clock minus monotonic clock, to convert between the two
+        self.offset = time.time() - time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".ts"):
+                self.open(name[:-3])
+
+    def open(self, key):
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = SeriesFile(os.path.join(self.directory, f"{key}.ts"), self.tier_layout)
+                self.series[key] = series
+        return series
+
+    def record(self, values, t):
+        """Append every numeric value in ``values`` sampled at monotonic time ``t``."""
+        for key, value in values.items():
+            if not isinstance(value, (int, float)):
+                continue
+            series = self.series.get(key) or self.open(key)
+            series.add(t + self.offset, value)
+
+    def window(self, key, seconds):
+        """Return ``(times, values)`` arrays for the last ``seconds`` before the newest sample.
+
+        Unlike StatHistory these are NumPy arrays; ``values`` is usually a
+        view of the file (see Tier.window), so copy it to keep it.
+        """
+        series = self.series.get(key)
+        if series is None:
+            return np.empty(0), np.empty(0, np.float32)
+        times, values = series.window(seconds)
+        return times - self.offset, values
+
+    def flush(self):
+        for series in list(self.series.values()):
+            series.map.flush()
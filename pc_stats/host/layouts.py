@@ -1,6 +1,8 @@
 # Display layout configurations for PC stats
 # Each layout defines widgets to display and their positioning
 
+import re
+
 LAYOUTS = [
     {
         "name": "Overview",
@@ -21,6 +23,7 @@ LAYOUTS = [
             {"type": "bar", "stat": "cpu_load", "row": 2, "label": "CPU%", "min": 0, "max": 100, "width": 120, "height": 10},
             {"type": "bar", "stat": "gpu_load", "row": 3, "label": "GPU%", "min": 0, "max": 100, "width": 120, "height": 10},
             {"type": "text", "stat": "fps", "row": 4, "label": "FPS"},
+            {"type": "text", "stat": "cpu_power", "row": 5, "label": "CPU W"},
         ]
     },
     {
@@ -36,6 +39,18 @@ LAYOUTS = [
             {"type": "circle_gauge", "stat": "fps", "center_y": 70, "label": "FPS", "min": 0, "max": 144, "radius": 45},
             {"type": "bar", "stat": "gpu_temp", "row": 4, "label": "GPU T", "min": 30, "max": 90, "width": 120, "height": 10},
             {"type": "bar", "stat": "gpu_load", "row": 5, "label": "GPU %", "min": 0, "max": 100, "width": 120, "height": 10},
+            {"type": "text", "stat": "fps_low", "row": 6, "label": "1% low"},
+        ]
+    },
+    {
+        "name": "Trends",
+        "widgets": [
+            {"type": "text", "stat": "cpu_load", "row": 0, "label": "CPU"},
+            {"type": "graph", "stat": "cpu_load", "row": 1, "min": 0, "max": 100, "width": 180, "height": 36, "seconds": 120},
+            {"type": "text", "stat": "gpu_temp", "row": 3, "label": "GPU T"},
+            {"type": "graph", "stat": "gpu_temp", "row": 4, "min": 30, "max": 90, "width": 180, "height": 36, "seconds": 120},
+            {"type": "text", "stat": "fps", "row": 6, "label": "FPS"},
+            {"type": "graph", "stat": "fps", "row": 7, "min": 0, "max": 144, "width": 140, "height": 28, "seconds": 120},
         ]
     },
 ]
@@ -43,17 +58,75 @@ LAYOUTS = [
 # Stat formatting and value extraction
 STAT_FORMATTERS = {
     "cpu_temp": lambda stats: f"{stats.get('cpu_temp_c') or 0:.0f}C",
-    "gpu_temp": lambda stats: f"{stats.get('gpu_temp_c') or 0:.0f}C",
     "cpu_load": lambda stats: f"{stats.get('cpu_load') or 0:.0f}%",
-    "gpu_load": lambda stats: f"{stats.get('gpu_load') or 0:.0f}%",
     "fps": lambda stats: f"{stats.get('fps') or 0:.0f}",
+    "fps_low": lambda stats: f"{stats.get('fps_low') or 0:.0f}",
+    "frametime": lambda stats: f"{stats.get('frametime_p50_ms') or 0:.1f}ms",
+    "cpu_power": lambda stats: f"{stats.get('cpu_power_w') or 0:.0f}W",
+    "cpu_clock": lambda stats: f"{stats.get('cpu_clock_mhz') or 0:.0f}MHz",
+    "cpu_fan": lambda stats: f"{stats.get('cpu_fan_rpm') or 0:.0f}RPM",
     "ram_usage": lambda stats: f"{stats.get('ram_used_mb') or 0:.0f}/{stats.get('ram_total_mb') or 0:.0f}MB",
 }
 
+# Stat -> collector key, for widgets that read the history (graph)
+STAT_KEYS = {
+    "cpu_temp": "cpu_temp_c",
+    "cpu_load": "cpu_load",
+    "cpu_power": "cpu_power_w",
+    "cpu_clock": "cpu_clock_mhz",
+    "cpu_fan": "cpu_fan_rpm",
+    "fps": "fps",
+    "fps_low": "fps_low",
+    "frametime": "frametime_p50_ms",
+}
+
 STAT_VALUES = {
     "cpu_temp": lambda stats: stats.get('cpu_temp_c') or 0,
-    "gpu_temp": lambda stats: stats.get('gpu_temp_c') or 0,
     "cpu_load": lambda stats: stats.get('cpu_load') or 0,
-    "gpu_load": lambda stats: stats.get('gpu_load') or 0,
+    "cpu_power": lambda stats: stats.get('cpu_power_w') or 0,
+    "cpu_clock": lambda stats: stats.get('cpu_clock_mhz') or 0,
+    "cpu_fan": lambda stats: stats.get('cpu_fan_rpm') or 0,
     "fps": lambda stats: stats.get('fps') or 0,
+    "fps_low": lambda stats: stats.get('fps_low') or 0,
+    "frametime": lambda stats: stats.get('frametime_p50_ms') or 0,
 }
+
+# GPU stats: "gpu_*" is the first GPU, "gpu0_*", "gpu1_*", ... address any
+# GPU. The numbered entries are added by resolve_stat when a layout uses them.
+GPU_STAT = re.compile(r"(gpu\d+)_(temp|load|power|mem_temp|vram)$")
+
+
+def add_gpu_stats(prefix):
+    def get(stats, metric):
+        return stats.get(f"{prefix}_{metric}") or 0
+
+    STAT_FORMATTERS.update({
+        f"{prefix}_temp": lambda stats: f"{get(stats, 'temp_c'):.0f}C",
+        f"{prefix}_load": lambda stats: f"{get(stats, 'load'):.0f}%",
+        f"{prefix}_power": lambda stats: f"{get(stats, 'power_w'):.0f}W",
+        f"{prefix}_mem_temp": lambda stats: f"{get(stats, 'mem_temp_c'):.0f}C",
+        f"{prefix}_vram": lambda stats: f"{get(stats, 'mem_used_mb') / 1024:.1f}/{get(stats, 'mem_total_mb') / 1024:.0f}GB",
+    })
+    STAT_KEYS.update({
+        f"{prefix}_temp": f"{prefix}_temp_c",
+        f"{prefix}_load": f"{prefix}_load",
+        f"{prefix}_power": f"{prefix}_power_w",
+        f"{prefix}_mem_temp": f"{prefix}_mem_temp_c",
+    })
+    STAT_VALUES.update({
+        f"{prefix}_temp": lambda stats: get(stats, 'temp_c'),
+        f"{prefix}_load": lambda stats: get(stats, 'load'),
+        f"{prefix}_power": lambda stats: get(stats, 'power_w'),
+        f"{prefix}_mem_temp": lambda stats: get(stats, 'mem_temp_c'),
+        f"{prefix}_vram": lambda stats: 100 * get(stats, 'mem_used_mb') / (get(stats, 'mem_total_mb') or 1),
+    })
+
+
+def resolve_stat(name):
+    """Add the entries for a ``gpuN_*`` stat the first time it is looked up."""
+    match = GPU_STAT.match(name)
+    if match and name not in STAT_VALUES and name not in STAT_FORMATTERS:
+        add_gpu_stats(match.group(1))
+
+
+add_gpu_stats("gpu")
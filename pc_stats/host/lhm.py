@@ -0,0 +1,268 @@
+# LibreHardwareMonitor sensor lookup
+#
+# The LHM data.json is a tree of {"Text", "Value", "Children", ...} nodes.
+# Walking the whole tree and comparing every name against every label on each
+# tick is wasteful, so SensorIndex walks it once, remembers where each wanted
+# sensor lives (child-index path, name and SensorId) and afterwards reads all
+# sensors directly. If the tree shape changes the index is rebuilt.
+#
+# LHMClient keeps one HTTP/1.1 connection open and, once the index knows the
+# SensorIds it needs, scans the response as it arrives and stops parsing as
+# soon as all of them have been seen.
+
+import http.client
+import json
+import re
+import urllib.parse
+
+CPU_TEMP_LABELS = [
+    "CCDs Average (Tdie)",      # AMD Ryzen average CCD temp
+    "Core (Tctl/Tdie)",          # AMD Ryzen core temp
+    "CPU Package",               # Intel
+    "CPU (Tctl/Tdie)",
+    "CCD1 (Tdie)",
+]
+
+# Stat key -> how to recognise the sensor. A node matches when its name
+# contains one of the labels and either its Type matches or its value text
+# carries the unit (older LHM versions have no Type field).
+LHM_SENSORS = {
+    "cpu_temp_c": {"labels": CPU_TEMP_LABELS, "type": "Temperature", "unit": "°C"},
+    "cpu_power_w": {"labels": ["CPU Package", "Package"], "type": "Power", "unit": " W"},
+    "cpu_clock_mhz": {"labels": ["Cores (Average)", "Core #1"], "type": "Clock", "unit": "MHz"},
+    "cpu_fan_rpm": {"labels": ["CPU Fan", "Fan #1"], "type": "Fan", "unit": "RPM"},
+}
+
+
+def parse_float_from_text(text):
+    if text is None:
+        return None
+    # Skip if it's a voltage reading
+    if "V" in text and "°C" not in text:
+        return None
+    cleaned = "".join(ch if (ch.isdigit() or ch == "." or ch == "-") else " " for ch in text)
+    for token in cleaned.split():
+        try:
+            return float(token)
+        except ValueError:
+            continue
+    return None
+
+
+def node_name(node):
+    return node.get("Text") or node.get("Name") or ""
+
+
+def node_value(node):
+    return node.get("Value") or node.get("value")
+
+
+def node_children(node):
+    if isinstance(node, list):
+        return node
+    return node.get("Children", []) + node.get("children", [])
+
+
+def node_matches(node, spec, lowered_name):
+    value = node_value(node)
+    if not value or not any(label.lower() in lowered_name for label in spec["labels"]):
+        return False
+    node_type = node.get("Type") or node.get("SensorType")
+    if node_type:
+        return node_type == spec["type"]
+    return spec["unit"] in value
+
+
+class SensorIndex:
+    """Where each wanted sensor lives in the LHM tree.
+
+    Entries map a stat key to ``{"path": [...], "text": ..., "sensor_id": ...}``
+    where ``path`` is the list of child indices from the root.
+    """
+
+    def __init__(self, specs=None, entries=None):
+        self.specs = LHM_SENSORS if specs is None else specs
+        self.entries = dict(entries or {})
+        self.discovered = bool(entries)
+
+    @classmethod
+    def load(cls, path, specs=None):
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return cls(specs, data.get("sensors", {}))
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"sensors": self.entries}, handle, indent=2, ensure_ascii=False)
+
+    def discover(self, tree):
+        """Walk the tree once and record the first match for every stat."""
+        self.entries = {}
+        pending = dict(self.specs)
+        stack = [(tree, [])]
+        while stack and pending:
+            node, path = stack.pop()
+            if isinstance(node, dict):
+                lowered = node_name(node).lower()
+                for key, spec in list(pending.items()):
+                    if node_matches(node, spec, lowered) and parse_float_from_text(node_value(node)) is not None:
+                        self.entries[key] = {
+                            "path": path,
+                            "text": node_name(node),
+                            "sensor_id": node.get("SensorId"),
+                        }
+                        del pending[key]
+            children = node_children(node)
+            # Reversed so the walk visits children in tree order
+            for i in range(len(children) - 1, -1, -1):
+                stack.append((children[i], path + [i]))
+        self.discovered = True
+
+    def resolve(self, tree, entry):
+        """Return the node an entry points at, or None if the tree changed."""
+        node = tree
+        try:
+            for i in entry["path"]:
+                node = node_children(node)[i]
+        except (IndexError, KeyError, TypeError, AttributeError):
+            return None
+        if not isinstance(node, dict) or node_name(node) != entry["text"]:
+            return None
+        if entry.get("sensor_id") and node.get("SensorId") != entry["sensor_id"]:
+            return None
+        return node
+
+    def sensor_ids(self):
+        """Return ``{SensorId: stat}``, or None if some entry has no SensorId."""
+        if not self.discovered or not self.entries:
+            return None
+        ids = {}
+        for key, entry in self.entries.items():
+            if not entry.get("sensor_id"):
+                return None
+            ids[entry["sensor_id"]] = key
+        return ids
+
+    def read(self, tree):
+        """Return ``{stat: value}`` for every wanted stat (None if missing)."""
+        if not self.discovered:
+            self.discover(tree)
+        values = self._read_entries(tree)
+        if values is None:
+            # The tree changed shape (hardware or LHM update); start over
+            self.discover(tree)
+            values = self._read_entries(tree) or {}
+        return {key: values.get(key) for key in self.specs}
+
+    def _read_entries(self, tree):
+        values = {}
+        for key, entry in self.entries.items():
+            node = self.resolve(tree, entry)
+            if node is None:
+                return None
+            values[key] = parse_float_from_text(node_value(node))
+        return values
+
+
+SENSOR_ID_RE = re.compile(rb'"SensorId"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+class LHMClient:
+    """Persistent-connection LHM reader that stops parsing early.
+
+    Sensor nodes are leaves (``"Children": []`` comes last), so each one can
+    be cut out of the raw response between the ``{`` before its SensorId and
+    the next ``}`` and decoded on its own. The rest of the body is drained
+    without decoding so the connection can be reused.
+    """
+
+    CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, url, index=None, timeout=2.0):
+        parts = urllib.parse.urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.https = parts.scheme == "https"
+        self.timeout = timeout
+        self.index = index if index is not None else SensorIndex()
+        self.connection = None
+        self.early_stops = 0
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _request(self):
+        for attempt in range(2):
+            if self.connection is None:
+                cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+                self.connection = cls(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request("GET", self.path, headers={"Connection": "keep-alive"})
+                response = self.connection.getresponse()
+            except (http.client.HTTPException, OSError):
+                # The server closed the idle connection; reconnect once
+                self.close()
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                response.read()
+                raise OSError(f"LHM returned HTTP {response.status}")
+            return response
+
+    def read(self):
+        """Fetch data.json and return ``{stat: value}``."""
+        response = self._request()
+        try:
+            wanted = self.index.sensor_ids()
+            if wanted is None:
+                return self.index.read(json.loads(response.read()))
+            values = self._scan(response, wanted)
+            if response.will_close:
+                self.close()
+            return values
+        except Exception:
+            self.close()
+            raise
+
+    def _scan(self, response, wanted):
+        buffer = bytearray()
+        found = {}
+        scan = 0
+        while True:
+            chunk = response.read(self.CHUNK_SIZE)
+            if not chunk:
+                # Not all sensors were seen; the tree changed, parse it fully
+                return self.index.read(json.loads(buffer))
+            buffer += chunk
+            # Keep some overlap so a SensorId split across chunks is not missed
+            next_scan = max(scan, len(buffer) - 512)
+            for match in SENSOR_ID_RE.finditer(buffer, scan):
+                key = wanted.get(match.group(1).decode("utf-8", errors="ignore"))
+                if key is None or key in found:
+                    continue
+                start = buffer.rfind(b"{", 0, match.start())
+                end = buffer.find(b"}", match.end())
+                if end < 0:
+                    # Node not complete yet, look at it again after the next chunk
+                    next_scan = min(next_scan, match.start())
+                    break
+                try:
+                    node = json.loads(buffer[start:end + 1])
+                except ValueError:
+                    # Not a plain leaf after all; fall back to a full parse
+                    return self.index.read(json.loads(buffer + response.read()))
+                found[key] = node
+            if len(found) == len(wanted):
+                break
+            scan = next_scan
+        self.early_stops += 1
+        while response.read(self.CHUNK_SIZE):
+            pass
+        values = {key: parse_float_from_text(node_value(node)) for key, node in found.items()}
+        return {key: values.get(key) for key in self.index.specs}
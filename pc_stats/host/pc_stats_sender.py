@@ -1,31 +1,62 @@
 import argparse
-import json
+import contextlib
+import cProfile
+import functools
 import math
 import os
+import pstats
+import signal
+import threading
 import time
-import urllib.request
-import subprocess
 from pathlib import Path
 
 import psutil
 import serial
-import pynvml
 from dotenv import load_dotenv
 
-from layouts import LAYOUTS, STAT_FORMATTERS, STAT_VALUES
+from capture import FrameRecorder
+from collector import StatsCollector, StatSource
+from gpu import GpuReader
+from history import StatHistory, lttb
+from history_store import HistoryStore
+from layouts import LAYOUTS, STAT_FORMATTERS, STAT_KEYS, STAT_VALUES, resolve_stat
+from lhm import LHM_SENSORS, LHMClient, SensorIndex
+from presentmon import PresentMonReader
+from profiler import StageTimers, write_collapsed
+from protocol import (ENCODERS, PROTOCOL_VERSION, SESSION_IDLE_SEC, FlowControl, FrameBuilder, FrameWriter,
+                      negotiate)
+from raster import Raster, RasterScene
+from scene import CommandRecorder, Scene
+from scheduler import FrameScheduler
+from stats_bus import DEFAULT_BUS_NAME, StatsSubscriber
+from stats_trace import StatsRecorder, StatsReplay
 
 # Load environment variables from .env file in pc_stats directory
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path)
 
+# FAKE_NVML=1 swaps in simulated GPUs for machines without NVIDIA hardware
+if os.environ.get("FAKE_NVML", "").lower() in {"1", "true", "yes"}:
+    import fake_pynvml as pynvml
+else:
+    import pynvml
 
 DEFAULT_BAUD = 115200
 DEFAULT_INTERVAL_SEC = 1.0
 LAYOUT_CYCLE_SEC = 10.0
+FULL_REDRAW_SEC = 60.0
+STALE_AFTER_SEC = float(os.environ.get("STALE_AFTER_SEC", "5"))
 SCREEN_WIDTH = 240
 SCREEN_HEIGHT = 240
 TOP_PAD = 14
 COLOR_ORDER = os.environ.get("COLOR_ORDER", "RGB").upper()
+WIRE_PROTOCOL = os.environ.get("WIRE_PROTOCOL", "auto").lower()
+# Frames allowed in flight before waiting for device acks (0 disables)
+FLOW_WINDOW = int(os.environ.get("FLOW_WINDOW", "2"))
+# Backoff between handshake or reconnect attempts while a display is busy,
+# booting or unplugged
+RETRY_SEC = 1.0
+RETRY_MAX_SEC = 30.0
 
 
 def parse_ui_color(value, default_rgb):
@@ -76,143 +107,123 @@ COLOR_GRAY = rgb565(140, 140, 140)
 
 # LibreHardwareMonitor web server JSON URL
 LHM_URL = os.environ.get("LHM_URL", "")
+# How often to poll LHM; defaults to the display interval
+LHM_POLL_SEC = float(os.environ.get("LHM_POLL_SEC", "0")) or None
 
 # PresentMon settings (optional)
 PRESENTMON_PATH = os.environ.get("PRESENTMON_PATH", "")
 PRESENTMON_PROCESS_NAME = os.environ.get("PRESENTMON_PROCESS_NAME", "")
+# Extra PresentMon arguments; the defaults match PresentMon 1.x flag names
+PRESENTMON_ARGS = os.environ.get("PRESENTMON_ARGS", "-output_stdout -stop_existing_session").split()
+PRESENTMON_WINDOW_SEC = float(os.environ.get("PRESENTMON_WINDOW_SEC", "2"))
+PRESENTMON_KEYS = ["fps", "fps_low", "frametime_p50_ms", "frametime_p95_ms", "frametime_p99_ms"]
 
-CPU_TEMP_LABELS = [
-    "CCDs Average (Tdie)",      # AMD Ryzen average CCD temp
-    "Core (Tctl/Tdie)",          # AMD Ryzen core temp
-    "CPU Package",               # Intel
-    "CPU (Tctl/Tdie)",
-    "CCD1 (Tdie)",
-]
+# Long-lived PresentMon process, started on first use
+presentmon_reader = None
 
+# All NVIDIA GPUs, enumerated in main()
+gpu_reader = GpuReader(pynvml)
 
-def parse_float_from_text(text):
-    if text is None:
-        return None
-    # Skip if it's a voltage reading
-    if "V" in text and "°C" not in text:
-        return None
-    cleaned = "".join(ch if (ch.isdigit() or ch == "." or ch == "-") else " " for ch in text)
-    for token in cleaned.split():
+# Graph history, opened in main() when a layout has graphs. It is kept on
+# disk in tiered ring files in HISTORY_DIR and survives restarts; with
+# HISTORY_DIR empty it is HISTORY_SIZE samples per stat in memory.
+HISTORY_SIZE = int(os.environ.get("HISTORY_SIZE", "1024"))
+HISTORY_DIR = os.environ.get("HISTORY_DIR", str(Path(__file__).parent.parent / "history"))
+
+# Per-stage durations (source reads, snapshot, drawing, writes); see --timings
+timers = StageTimers()
+
+# Shared-memory block published by stats_bus.py, for --subscribe
+STATS_BUS_NAME = os.environ.get("STATS_BUS_NAME", DEFAULT_BUS_NAME)
+
+# Saved LHM sensor index (see debug_lhm.py --export); rebuilt when stale
+LHM_INDEX_PATH = os.environ.get("LHM_INDEX_PATH", str(Path(__file__).parent.parent / "lhm_index.json"))
+
+
+def load_sensor_index():
+    if os.path.exists(LHM_INDEX_PATH):
         try:
-            return float(token)
-        except ValueError:
-            continue
-    return None
+            return SensorIndex.load(LHM_INDEX_PATH)
+        except (OSError, ValueError) as e:
+            print(f"DEBUG: Ignoring LHM index {LHM_INDEX_PATH}: {e}")
+    return SensorIndex()
 
 
-def find_value_by_labels(node, labels):
-    if isinstance(node, dict):
-        name = node.get("Text") or node.get("Name") or ""
-        value = node.get("Value") or node.get("value")
-        if value and any(label.lower() in name.lower() for label in labels):
-            parsed = parse_float_from_text(value)
-            if parsed is not None:
-                return parsed
-        for child in node.get("Children", []) + node.get("children", []):
-            found = find_value_by_labels(child, labels)
-            if found is not None:
-                return found
-    elif isinstance(node, list):
-        for item in node:
-            found = find_value_by_labels(item, labels)
-            if found is not None:
-                return found
-    return None
+lhm_index = load_sensor_index()
+lhm_client = LHMClient(LHM_URL, lhm_index) if LHM_URL else None
 
 
-def read_lhm_cpu_temp():
-    if not LHM_URL:
-        return None
+def read_lhm_stats():
+    """Read every indexed LHM sensor from one data.json fetch."""
+    if lhm_client is None:
+        return {key: None for key in LHM_SENSORS}
     try:
-        with urllib.request.urlopen(LHM_URL, timeout=2) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        temp = find_value_by_labels(data, CPU_TEMP_LABELS)
+        values = lhm_client.read()
+        temp = values["cpu_temp_c"]
         if temp is not None and temp < 10:
             # Likely found wrong sensor, print debug info
             print(f"DEBUG: Found suspiciously low temp: {temp}C")
-        return temp
+        return values
     except Exception as e:
         print(f"DEBUG: LHM error: {e}")
-        return None
+        return {key: None for key in LHM_SENSORS}
 
 
-def read_presentmon_fps():
+def read_presentmon_stats():
+    """Rolling FPS stats from the long-running PresentMon process."""
+    global presentmon_reader
     if not PRESENTMON_PATH or not PRESENTMON_PROCESS_NAME:
-        return None
-    try:
-        output_file = "presentmon_sample.csv"
-        cmd = [
-            PRESENTMON_PATH,
-            "-process_name",
-            PRESENTMON_PROCESS_NAME,
-            "-output_file",
-            output_file,
-            "-timed",
-            "1",
-        ]
-        subprocess.run(cmd, check=False, capture_output=True, text=True)
-        if not os.path.exists(output_file):
-            return None
-        with open(output_file, "r", encoding="utf-8", errors="ignore") as handle:
-            lines = [line.strip() for line in handle.readlines() if line.strip()]
-        if len(lines) < 2:
-            return None
-        header = lines[0].split(",")
-        last_row = lines[-1].split(",")
-        fps_index = None
-        for i, name in enumerate(header):
-            if name.lower() in ("averagefps", "fps"):
-                fps_index = i
-                break
-        if fps_index is None or fps_index >= len(last_row):
-            return None
-        return float(last_row[fps_index])
-    except Exception:
-        return None
+        return {key: None for key in PRESENTMON_KEYS}
+    if presentmon_reader is None:
+        cmd = [PRESENTMON_PATH, "-process_name", PRESENTMON_PROCESS_NAME] + PRESENTMON_ARGS
+        presentmon_reader = PresentMonReader(cmd, window_sec=PRESENTMON_WINDOW_SEC)
+        presentmon_reader.start()
+    return presentmon_reader.stats()
 
 
-def read_gpu_stats(handle):
-    try:
-        temp = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
-        util = pynvml.nvmlDeviceGetUtilizationRates(handle)
-        mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
-        return {
-            "gpu_temp_c": float(temp),
-            "gpu_load": float(util.gpu),
-            "gpu_mem_used_mb": float(mem.used) / (1024 * 1024),
-            "gpu_mem_total_mb": float(mem.total) / (1024 * 1024),
-        }
-    except Exception:
-        return {
-            "gpu_temp_c": None,
-            "gpu_load": None,
-            "gpu_mem_used_mb": None,
-            "gpu_mem_total_mb": None,
-        }
-
-
-def gather_stats(gpu_handle):
-    cpu_temp = read_lhm_cpu_temp()
+def read_gpu_stats():
+    return gpu_reader.read()
+
+
+def close_sources():
+    """Stop the PresentMon child (ending its ETW session) and close the LHM connection."""
+    if presentmon_reader is not None:
+        presentmon_reader.stop()
+    if lhm_client is not None:
+        lhm_client.close()
+
+
+def read_system_stats():
     cpu_load = psutil.cpu_percent(interval=None)
     mem = psutil.virtual_memory()
-    fps = read_presentmon_fps()
-    gpu_stats = read_gpu_stats(gpu_handle)
-
     return {
-        "cpu_temp_c": cpu_temp,
         "cpu_load": float(cpu_load),
         "ram_used_mb": float(mem.used) / (1024 * 1024),
         "ram_total_mb": float(mem.total) / (1024 * 1024),
-        "fps": fps,
-        **gpu_stats,
     }
 
 
+def open_history():
+    if HISTORY_DIR:
+        return HistoryStore(HISTORY_DIR)
+    return StatHistory(HISTORY_SIZE)
+
+
+def build_collector(interval, history=None, timers=timers):
+    """Create one background worker per stats source."""
+    def source(name, read, keys, deadline, period=None):
+        period = period or interval
+        stale_after = max(STALE_AFTER_SEC, 3 * period, 2 * deadline)
+        return StatSource(name, read, keys, period=period, deadline=deadline, stale_after=stale_after)
+
+    return StatsCollector([
+        source("lhm", read_lhm_stats, list(LHM_SENSORS), deadline=2.0, period=LHM_POLL_SEC),
+        source("presentmon", read_presentmon_stats, PRESENTMON_KEYS, deadline=0.1),
+        source("gpu", read_gpu_stats, gpu_reader.keys(), deadline=0.5),
+        source("system", read_system_stats, ["cpu_load", "ram_used_mb", "ram_total_mb"], deadline=0.5),
+    ], history=history, timers=timers)
+
+
 def fmt_temp(value):
     if value is None:
         return "--"
@@ -237,35 +248,34 @@ def fmt_mem(used_mb, total_mb):
     return f"{used_mb:.0f}/{total_mb:.0f}MB"
 
 
-def circle_text_offset(y, base_x=10, font_w=8, font_h=8, edge_padding=4):
-    """Calculate horizontal offset for circular display."""
-    center_x = SCREEN_WIDTH // 2
-    center_y = SCREEN_HEIGHT // 2
-    radius = min(SCREEN_WIDTH, SCREEN_HEIGHT) // 2
-    line_center = y + (font_h // 2)
-    dy = line_center - center_y
-
-    if dy * dy >= radius * radius:
-        return None
-
-    max_half = int(math.sqrt((radius * radius) - (dy * dy)))
-    left_x = center_x - max_half + edge_padding
+def send_command(frame, cmd, *args):
+    """Queue command on the frame builder; "show" flushes the frame to device."""
+    frame.add(cmd, *args)
 
-    if left_x < base_x:
-        left_x = base_x
 
-    spaces_needed = (left_x - base_x + font_w - 1) // font_w
-    return " " * spaces_needed
+def select_protocol(ser, requested):
+    """Pick the wire protocol, using the device handshake for "auto".
 
+    Returns ``(name, caps)`` where caps are the optional commands the device
+    advertised.
+    """
+    if requested == "csv":
+        return "csv", set()
+    reply = negotiate(ser)
+    if reply is not None and reply[0] >= PROTOCOL_VERSION:
+        return "binary", reply[1]
+    if requested == "binary":
+        raise RuntimeError("Device did not answer the binary protocol handshake")
+    return "csv", set()
 
-def send_command(ser, cmd, *args):
-    """Send CSV command to device."""
-    line = ",".join([cmd] + [str(arg) for arg in args]) + "\n"
-    ser.write(line.encode("utf-8"))
 
+def circle_text_span(y, base_x=10, font_w=8, font_h=8, edge_padding=4):
+    """Return ``(left_x, max_chars)`` for text on row ``y`` of the round display.
 
-def circle_text_offset(y, base_x=10, font_w=8, font_h=8, edge_padding=4):
-    """Calculate horizontal offset for circular display."""
+    ``left_x`` is the first pixel column that clears the bezel and
+    ``max_chars`` how many glyphs fit before the right edge; None when the
+    row is outside the circle.
+    """
     center_x = SCREEN_WIDTH // 2
     center_y = SCREEN_HEIGHT // 2
     radius = min(SCREEN_WIDTH, SCREEN_HEIGHT) // 2
@@ -276,13 +286,11 @@ def circle_text_offset(y, base_x=10, font_w=8, font_h=8, edge_padding=4):
         return None
 
     max_half = int(math.sqrt((radius * radius) - (dy * dy)))
-    left_x = center_x - max_half + edge_padding
-
-    if left_x < base_x:
-        left_x = base_x
-
-    spaces_needed = (left_x - base_x + font_w - 1) // font_w
-    return " " * spaces_needed
+    left_x = max(center_x - max_half + edge_padding, base_x)
+    right_x = min(center_x + max_half - edge_padding, SCREEN_WIDTH - base_x)
+    if right_x - left_x < font_w:
+        return None
+    return left_x, (right_x - left_x) // font_w
 
 
 def interpolate_color(value, min_val, max_val):
@@ -305,132 +313,262 @@ def interpolate_color(value, min_val, max_val):
     return rgb565(r, g, b)
 
 
-def draw_text_widget(ser, widget, stats, y):
-    """Draw a text widget."""
-    stat = widget["stat"]
-    label = widget.get("label", "")
-    text = STAT_FORMATTERS.get(stat, lambda s: "N/A")(stats)
-    full_text = f"{label}: {text}" if label else text
-    
-    offset = circle_text_offset(y)
-    if offset is not None:
-        send_command(ser, "text", offset + full_text, 10, y, COLOR_TEXT)
-
-
-def draw_bar_widget(ser, widget, stats, y):
-    """Draw a horizontal bar widget."""
-    stat = widget["stat"]
-    label = widget.get("label", "")
-    min_val = widget.get("min", 0)
-    max_val = widget.get("max", 100)
-    width = widget.get("width", 100)
-    height = widget.get("height", 10)
-    
-    value = STAT_VALUES.get(stat, lambda s: 0)(stats)
-    ratio = max(0, min(1, (value - min_val) / (max_val - min_val)))
-    fill_width = int(width * ratio)
-    
-    # Calculate position with circular offset
-    offset_spaces = circle_text_offset(y, font_w=8)
-    if offset_spaces is None:
-        return
-    x_offset = len(offset_spaces) * 8
-    x = 10 + x_offset
-    
-    # Draw label to the left of bar if provided
-    if label:
-        send_command(ser, "text", offset_spaces + label, 10, y + 1, COLOR_TEXT)
-        label_width = len(label) * 8
-        x = x + label_width + 8  # Add spacing after label
-    
-    # Draw bar outline
-    send_command(ser, "rect", x, y, width, height, COLOR_FG)
-    # Draw fill
-    if fill_width > 2:
-        send_command(ser, "fill_rect", x + 1, y + 1, fill_width - 2, height - 2, COLOR_FG)
-    
-    # Draw value text inside bar
-    value_text = f"{value:.0f}%"
-    text_x = x + (width // 2) - (len(value_text) * 4)
-    text_y = y + 1
-    send_command(ser, "text", value_text, text_x, text_y, COLOR_TEXT_INVERT)
-
-
-def draw_colored_bar_widget(ser, widget, stats, y):
-    """Draw a colored bar widget with gradient."""
-    stat = widget["stat"]
-    label = widget.get("label", "")
-    min_val = widget.get("min", 0)
-    max_val = widget.get("max", 100)
-    width = widget.get("width", 100)
-    height = widget.get("height", 10)
-    
-    value = STAT_VALUES.get(stat, lambda s: 0)(stats)
-    ratio = max(0, min(1, (value - min_val) / (max_val - min_val)))
-    fill_width = int(width * ratio)
-    color = interpolate_color(value, min_val, max_val)
-    
-    # Calculate position
-    offset_spaces = circle_text_offset(y)
-    if offset_spaces is None:
-        return
-    x_offset = len(offset_spaces) * 8
-    x = 10 + x_offset
-    
-    # Draw label to the left of bar
-    if label:
-        send_command(ser, "text", offset_spaces + label, 10, y + 1, COLOR_TEXT)
-        label_width = len(label) * 8
-        x = x + label_width + 8  # Add spacing after label
-    
-    # Draw bar
-    send_command(ser, "rect", x, y, width, height, COLOR_FG)
-    if fill_width > 2:
-        send_command(ser, "fill_rect", x + 1, y + 1, fill_width - 2, height - 2, color)
-    
-    # Draw value text inside bar
-    value_text = f"{value:.0f}"
-    text_x = x + (width // 2) - (len(value_text) * 4)
-    text_y = y + 1
-    send_command(ser, "text", value_text, text_x, text_y, COLOR_TEXT)
-
-
-def draw_circle_gauge_widget(ser, widget, stats):
-    """Draw a circular gauge (arc) with center value."""
-    stat = widget["stat"]
-    label = widget.get("label", "")
-    center_y = widget.get("center_y", SCREEN_HEIGHT // 2)
-    radius = widget.get("radius", 40)
-    thickness = widget.get("thickness", 15)
-    min_val = widget.get("min", 0)
-    max_val = widget.get("max", 100)
-    
-    center_x = SCREEN_WIDTH // 2
-    value = STAT_VALUES.get(stat, lambda s: 0)(stats)
-    ratio = max(0, min(1, (value - min_val) / (max_val - min_val)))
-    
-    # Draw ring background
-    draw_arc(ser, center_x, center_y, radius, 135, -135, COLOR_GRAY, thickness=thickness)
-
-    # Draw value arc
-    sweep = 270
-    end_angle = 135 - (sweep * ratio)
-    draw_arc(ser, center_x, center_y, radius, 135, end_angle, interpolate_color(value, min_val, max_val), thickness=thickness)
-    
-    # Draw center value
-    text_value = f"{value:.0f}"
-    text_x = center_x - len(text_value) * 4  # Approximate center
-    text_y = center_y - 4
-    send_command(ser, "text", text_value, text_x, text_y, COLOR_TEXT)
-    
-    # Draw label below
-    if label:
-        label_x = center_x - len(label) * 4
-        label_y = center_y + 10
-        send_command(ser, "text", label, label_x, label_y, COLOR_TEXT)
-
-
-def draw_arc(ser, cx, cy, radius, start_deg, end_deg, color, thickness=1):
+# Precomputed per-row text spans and gauge/bar colors; the plan below
+# looks these up instead of recomputing them every frame
+CIRCLE_TEXT_SPANS = [circle_text_span(y) for y in range(SCREEN_HEIGHT)]
+GRADIENT_STEPS = 256
+GRADIENT_LUT = [interpolate_color(i, 0, GRADIENT_STEPS - 1) for i in range(GRADIENT_STEPS)]
+
+ROW_Y = [25 + TOP_PAD, 45 + TOP_PAD, 65 + TOP_PAD, 90 + TOP_PAD, 110 + TOP_PAD,
+         130 + TOP_PAD, 150 + TOP_PAD, 170 + TOP_PAD, 190 + TOP_PAD, 210 + TOP_PAD]
+
+
+def text_span(y):
+    """``(left_x, max_chars)`` for text on row ``y``, or None if off-screen."""
+    if 0 <= y < SCREEN_HEIGHT:
+        return CIRCLE_TEXT_SPANS[y]
+    return None
+
+
+def row_y(row):
+    return ROW_Y[row] if row < len(ROW_Y) else TOP_PAD + 20 + row * 20
+
+
+def value_ratio(value, min_val, max_val):
+    return max(0, min(1, (value - min_val) / (max_val - min_val)))
+
+
+def gradient_color(ratio):
+    """Green -> yellow -> red for a 0..1 ratio."""
+    return GRADIENT_LUT[int(ratio * (GRADIENT_STEPS - 1))]
+
+
+class Widget:
+    """Base for layout widgets.
+
+    ``draw_static`` emits the decoration that never changes (labels,
+    outlines) and ``draw_dynamic`` the value drawn over it, so incremental
+    redraws only clear and resend the value.
+    """
+
+    def draw_static(self, frame):
+        pass
+
+    def draw_dynamic(self, frame, stats):
+        pass
+
+    def draw(self, frame, stats):
+        self.draw_static(frame)
+        self.draw_dynamic(frame, stats)
+
+
+class TitleWidget(Widget):
+    """Layout name at the top of the screen."""
+
+    def __init__(self, name):
+        span = text_span(TOP_PAD)
+        self.command = ("text", name[:span[1]], span[0], TOP_PAD, COLOR_TEXT) if span else None
+
+    def draw_static(self, frame):
+        if self.command:
+            frame.add(*self.command)
+
+
+class TextWidget(Widget):
+    """``label: value`` on a row."""
+
+    def __init__(self, widget):
+        self.y = row_y(widget.get("row", 0))
+        span = text_span(self.y)
+        label = widget.get("label", "")
+        self.visible = span is not None
+        self.x, self.max_chars = span or (0, 0)
+        self.prefix = f"{label}: " if label else ""
+        self.format = STAT_FORMATTERS.get(widget["stat"], lambda s: "N/A")
+
+    def draw_dynamic(self, frame, stats):
+        if self.visible:
+            # Truncate rather than run past the right edge of the circle
+            text = (self.prefix + self.format(stats))[:self.max_chars]
+            frame.add("text", text, self.x, self.y, COLOR_TEXT)
+
+
+class BarWidget(Widget):
+    """Horizontal bar with an optional label to its left."""
+
+    colored = False
+
+    def __init__(self, widget):
+        y = row_y(widget.get("row", 0))
+        self.min = widget.get("min", 0)
+        self.max = widget.get("max", 100)
+        self.width = widget.get("width", 100)
+        self.height = widget.get("height", 10)
+        self.value = STAT_VALUES.get(widget["stat"], lambda s: 0)
+        self.y = y
+        span = text_span(y)
+        self.visible = span is not None
+        if not self.visible:
+            return
+        x = span[0]
+        label = widget.get("label", "")
+        self.static = []
+        if label:
+            self.static.append(("text", label, x, y + 1, COLOR_TEXT))
+            x += len(label) * 8 + 8  # Add spacing after label
+        self.static.append(("rect", x, y, self.width, self.height, COLOR_FG))
+        self.x = x
+
+    def draw_static(self, frame):
+        if self.visible:
+            for command in self.static:
+                frame.add(*command)
+
+    def draw_dynamic(self, frame, stats):
+        if not self.visible:
+            return
+        value = self.value(stats)
+        ratio = value_ratio(value, self.min, self.max)
+        fill_width = int(self.width * ratio)
+        if fill_width > 2:
+            color = gradient_color(ratio) if self.colored else COLOR_FG
+            frame.add("fill_rect", self.x + 1, self.y + 1, fill_width - 2, self.height - 2, color)
+        # Value text centred inside the bar
+        if self.colored:
+            text, color = f"{value:.0f}", COLOR_TEXT
+        else:
+            text, color = f"{value:.0f}%", COLOR_TEXT_INVERT
+        frame.add("text", text, self.x + (self.width // 2) - (len(text) * 4), self.y + 1, color)
+
+
+class ColoredBarWidget(BarWidget):
+    """Bar whose fill goes from green to red with the value."""
+
+    colored = True
+
+
+class CircleGaugeWidget(Widget):
+    """Ring gauge with the value in the centre and the label below."""
+
+    def __init__(self, widget):
+        self.cx = SCREEN_WIDTH // 2
+        self.cy = widget.get("center_y", SCREEN_HEIGHT // 2)
+        self.radius = widget.get("radius", 40)
+        self.thickness = widget.get("thickness", 15)
+        self.min = widget.get("min", 0)
+        self.max = widget.get("max", 100)
+        self.value = STAT_VALUES.get(widget["stat"], lambda s: 0)
+        label = widget.get("label", "")
+        self.label = ("text", label, self.cx - len(label) * 4, self.cy + 10, COLOR_TEXT) if label else None
+
+    def draw_static(self, frame):
+        draw_ring(frame, self.cx, self.cy, self.radius, self.thickness, 135, -135, COLOR_GRAY)
+        if self.label:
+            frame.add(*self.label)
+
+    def draw_dynamic(self, frame, stats):
+        value = self.value(stats)
+        ratio = value_ratio(value, self.min, self.max)
+        end_angle = 135 - (270 * ratio)
+        draw_ring(frame, self.cx, self.cy, self.radius, self.thickness, 135, end_angle, gradient_color(ratio))
+        text = f"{value:.0f}"
+        frame.add("text", text, self.cx - len(text) * 4, self.cy - 4, COLOR_TEXT)
+
+
+class GraphWidget(Widget):
+    """Line graph of the last ``seconds`` of a stat from the history."""
+
+    def __init__(self, widget, history):
+        y = row_y(widget.get("row", 0))
+        self.history = history
+        self.key = STAT_KEYS.get(widget["stat"], widget["stat"])
+        self.min = widget.get("min", 0)
+        self.max = widget.get("max", 100)
+        self.height = widget.get("height", 30)
+        self.seconds = widget.get("seconds", 60)
+        self.points = widget.get("points", 48)
+        # The box has to fit inside the circle at its top and bottom rows
+        spans = [text_span(y), text_span(y + self.height - 8)]
+        self.visible = None not in spans
+        if not self.visible:
+            return
+        x = max(span[0] for span in spans)
+        right = min(span[0] + span[1] * 8 for span in spans)
+        label = widget.get("label", "")
+        self.static = []
+        if label:
+            self.static.append(("text", label, x, y + 1, COLOR_TEXT))
+            x += len(label) * 8 + 8
+        self.x = x
+        self.y = y
+        self.width = min(widget.get("width", 150), right - x)
+        self.static.append(("rect", x, y, self.width, self.height, COLOR_FG))
+
+    def draw_static(self, frame):
+        if self.visible:
+            for command in self.static:
+                frame.add(*command)
+
+    def draw_dynamic(self, frame, stats):
+        if not self.visible or self.history is None:
+            return
+        times, values = self.history.window(self.key, self.seconds)
+        if len(times) < 2:
+            return
+        if hasattr(times, "tolist"):
+            # HistoryStore returns arrays viewing its files; lttb works on lists
+            times, values = times.tolist(), values.tolist()
+        times, values = lttb(times, values, self.points)
+        start = times[-1] - self.seconds
+        x_scale = (self.width - 3) / self.seconds
+        bottom = self.y + self.height - 2
+        y_scale = (self.height - 3) / (self.max - self.min)
+        previous = None
+        for t, value in zip(times, values):
+            value = min(max(value, self.min), self.max)
+            point = (self.x + 1 + int((t - start) * x_scale), bottom - int((value - self.min) * y_scale))
+            if previous is not None:
+                frame.add("line", previous[0], previous[1], point[0], point[1], COLOR_FG)
+            previous = point
+
+
+WIDGET_TYPES = {
+    "text": TextWidget,
+    "bar": BarWidget,
+    "colored_bar": ColoredBarWidget,
+    "circle_gauge": CircleGaugeWidget,
+    "graph": GraphWidget,
+}
+
+
+class RenderPlan:
+    """A layout compiled once into widgets with everything static resolved.
+
+    Each frame only evaluates the stat values and emits the dynamic commands.
+    Graph widgets read ``history``.
+    """
+
+    def __init__(self, layout, history=None):
+        self.name = layout["name"]
+        self.widgets = [TitleWidget(self.name)]
+        for widget in layout["widgets"]:
+            resolve_stat(widget["stat"])
+            cls = WIDGET_TYPES.get(widget["type"])
+            if cls is GraphWidget:
+                self.widgets.append(cls(widget, history))
+            elif cls is not None:
+                self.widgets.append(cls(widget))
+
+
+def draw_ring(frame, cx, cy, radius, thickness, start_deg, end_deg, color):
+    """Draw a thick arc, natively when the target supports the arc command."""
+    if "arc" in frame.caps:
+        send_command(frame, "arc", cx, cy, radius, thickness, round(start_deg), round(end_deg), color)
+    else:
+        draw_arc(frame, cx, cy, radius, start_deg, end_deg, color, thickness=thickness)
+
+
+def draw_arc(frame, cx, cy, radius, start_deg, end_deg, color, thickness=1):
     """Draw an arc using short line segments."""
     step = 4
     if end_deg > start_deg:
@@ -451,54 +589,50 @@ def draw_arc(ser, cx, cy, radius, start_deg, end_deg, color, thickness=1):
                 next_angle = end_deg
             x1, y1 = point_at(r, angle)
             x2, y2 = point_at(r, next_angle)
-            send_command(ser, "line", x1, y1, x2, y2, color)
+            send_command(frame, "line", x1, y1, x2, y2, color)
             if next_angle == end_deg:
                 break
             angle = next_angle
 
 
-def draw_layout(ser, layout, stats):
+def draw_layout(frame, plan, stats):
     """Draw a complete layout."""
-    send_command(ser, "fill", COLOR_BG)
-    
-    # Draw layout name at top
-    title = layout["name"]
-    title_y = TOP_PAD
-    title_offset = circle_text_offset(title_y)
-    if title_offset is not None:
-        send_command(ser, "text", title_offset + title, 10, title_y, COLOR_TEXT)
-    
-    # Process widgets
-    row_y = [25 + TOP_PAD, 45 + TOP_PAD, 65 + TOP_PAD, 90 + TOP_PAD, 110 + TOP_PAD,
-             130 + TOP_PAD, 150 + TOP_PAD, 170 + TOP_PAD, 190 + TOP_PAD, 210 + TOP_PAD]
-    
-    for widget in layout["widgets"]:
-        widget_type = widget["type"]
-        
-        if widget_type == "text":
-            row = widget.get("row", 0)
-            y = row_y[row] if row < len(row_y) else TOP_PAD + 20 + row * 20
-            draw_text_widget(ser, widget, stats, y)
-            
-        elif widget_type == "bar":
-            row = widget.get("row", 0)
-            y = row_y[row] if row < len(row_y) else TOP_PAD + 20 + row * 20
-            draw_bar_widget(ser, widget, stats, y)
-            
-        elif widget_type == "colored_bar":
-            row = widget.get("row", 0)
-            y = row_y[row] if row < len(row_y) else TOP_PAD + 20 + row * 20
-            draw_colored_bar_widget(ser, widget, stats, y)
-            
-        elif widget_type == "circle_gauge":
-            draw_circle_gauge_widget(ser, widget, stats)
-    
-    send_command(ser, "show")
-
-
-def draw_stats(ser, stats):
+    frame.add("fill", COLOR_BG)
+    for widget in plan.widgets:
+        widget.draw(frame, stats)
+    frame.add("show")
+
+
+def draw_layout_incremental(frame, scene, plan, stats):
+    """Redraw only the widgets whose output changed since the last frame.
+
+    Each widget's static decoration and its value are separate scene parts,
+    so a new value clears and resends only the value. Returns True when a
+    frame was sent.
+    """
+    parts = []
+    for widget in plan.widgets:
+        static = CommandRecorder(frame.caps)
+        widget.draw_static(static)
+        dynamic = CommandRecorder(frame.caps)
+        widget.draw_dynamic(dynamic, stats)
+        parts += (static.commands, dynamic.commands)
+    return scene.update(frame, plan, parts)
+
+
+def draw_layout_raster(frame, raster_scene, plan, stats):
+    """Render the layout on the host and send the changed pixels.
+
+    Returns True when a frame was sent.
+    """
+    raster = Raster(SCREEN_WIDTH, SCREEN_HEIGHT)
+    draw_layout(raster, plan, stats)
+    return raster_scene.update(frame, raster.pixels)
+
+
+def draw_stats(frame, stats):
     """Send drawing commands to device."""
-    send_command(ser, "fill", COLOR_BG)
+    send_command(frame, "fill", COLOR_BG)
 
     cpu_temp = fmt_temp(stats["cpu_temp_c"])
     gpu_temp = fmt_temp(stats["gpu_temp_c"])
@@ -518,43 +652,398 @@ def draw_stats(ser, stats):
     ]
 
     for text, y in lines:
-        offset = circle_text_offset(y)
-        if offset is not None:
-            send_command(ser, "text", offset + text, 10, y, COLOR_TEXT)
-
-    send_command(ser, "show")
+        span = text_span(y)
+        if span is not None:
+            send_command(frame, "text", text[:span[1]], span[0], y, COLOR_TEXT)
+
+    send_command(frame, "show")
+
+
+def parse_display(spec):
+    """Split ``PORT[=Layout,Layout]`` into the port and the layouts it shows."""
+    port, _, names = spec.partition("=")
+    if not names:
+        return port, list(LAYOUTS)
+    by_name = {layout["name"].lower(): layout for layout in LAYOUTS}
+    layouts = []
+    for name in names.split(","):
+        layout = by_name.get(name.strip().lower())
+        if layout is None:
+            choices = ", ".join(layout["name"] for layout in LAYOUTS)
+            raise ValueError(f"Unknown layout {name.strip()!r} for {port}; choose from: {choices}")
+        layouts.append(layout)
+    return port, layouts
+
+
+class Display:
+    """One display: its own wire protocol, scenes, frame writer and flow control.
+
+    The sampling loop hands every display the same stats through ``update``.
+    Each display renders on its own thread and only ever takes the newest
+    update, so a slow or unresponsive board drops its own frames without
+    delaying the others. A display that fails (unplugged, write error) drops
+    its frames and reopens its port on its own thread, backing off between
+    attempts; the error never reaches the sampling loop.
+    """
+
+    def __init__(self, port, layouts, args, history=None):
+        self.port = port
+        self.args = args
+        self.plans = [RenderPlan(layout, history) for layout in layouts]
+        self.layout_idx = 0
+        self.ser = None
+        self.flow = None
+        self.writer = None
+        self.frames = 0
+        self.superseded = 0
+        # Frames with nothing new to send, whichever render mode caught it
+        self.unchanged = 0
+        self.hello_failures = 0
+        self.hello_pending = False
+        self.hello_retry_at = 0.0
+        self.hello_backoff = RETRY_SEC
+        self.error = None
+        self.failures = 0
+        self.dropped = 0
+        self.retry_at = 0.0
+        self.retry_backoff = RETRY_SEC
+        self.recorder = None
+        self.stream = None
+        self._pending = None
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def connect(self, ser, recorder=None):
+        """Handshake with the device and set up this display's frame path."""
+        self.ser = ser
+        self.recorder = recorder
+        self.handshake(self.args.protocol)
+        print(f"{self.port}: wire protocol {self.protocol}, layouts: {', '.join(plan.name for plan in self.plans)}")
+        if self.flow is not None:
+            print(f"{self.port}: flow control, {self.args.window} frames in flight")
+        self.last_layout_switch = None
+
+    def handshake(self, protocol):
+        args = self.args
+        self.protocol, self.caps = select_protocol(self.ser, protocol)
+        if args.render == "raster" and "blit" not in self.caps:
+            raise RuntimeError(f"--render raster needs a device with binary protocol blit support ({self.port})")
+        self.flow = None
+        if args.window > 0 and "ack" in self.caps:
+            self.flow = FlowControl(self.ser, args.window)
+            self.flow.enable()
+        # Frames are written on a background thread while the next one renders
+        record = None
+        if self.recorder is not None:
+            if self.stream is None:
+                self.stream = self.recorder.add_stream(self.port, self.protocol, self.caps)
+            record = functools.partial(self.recorder.frame, self.stream)
+        self.writer = FrameWriter(self.ser, ENCODERS[self.protocol]("show"), self.flow,
+                                  timers=timers, stage=f"write/{self.port}", record=record)
+        self.writer.start()
+        self.frame = FrameBuilder(self.writer, ENCODERS[self.protocol], self.caps, skip_unchanged=True)
+        self.scene = Scene(COLOR_BG)
+        self.raster_scene = RasterScene()
+        self.hello_pending = False
+        self.hello_backoff = RETRY_SEC
+        self.last_write = self.last_full_redraw = time.monotonic()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"display-{self.port}", daemon=True)
+        self._thread.start()
+
+    def update(self, stats, frame_time):
+        """Hand over the stats for the next frame; an update not yet rendered is replaced."""
+        if self._thread is None:
+            # Not started (--profile): render on the caller's thread
+            self.step(stats, frame_time)
+            return
+        with self._cond:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = (stats, frame_time)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                (stats, frame_time), self._pending = self._pending, None
+            self.step(stats, frame_time)
+
+    def step(self, stats, frame_time):
+        """Render one update, or try to reconnect once the backoff has passed."""
+        if self.error is not None:
+            if time.monotonic() < self.retry_at or not self.reconnect():
+                self.dropped += 1
+                return
+        try:
+            if self.writer.error is not None:
+                raise self.writer.error
+            self.render(stats, frame_time)
+        except Exception as e:
+            self.fail(e)
+
+    def fail(self, error):
+        self.error = error
+        self.failures += 1
+        self.retry_at = time.monotonic() + self.retry_backoff
+        print(f"DEBUG: {self.port} failed ({error!r}), reconnecting in {self.retry_backoff:.0f} s")
+        self.retry_backoff = min(self.retry_backoff * 2, RETRY_MAX_SEC)
+
+    def reconnect(self):
+        """Reopen the port and handshake again; returns False and backs off on failure."""
+        try:
+            # Closing first makes a writer stuck on the old port give up
+            self.ser.close()
+            self.writer.stop()
+            self.ser.open()
+            self.handshake(self.protocol)
+        except Exception as e:
+            self.fail(e)
+            return False
+        print(f"{self.port}: reconnected, wire protocol {self.protocol}")
+        self.error = None
+        self.retry_backoff = RETRY_SEC
+        return True
+
+    def invalidate(self):
+        self.scene.invalidate()
+        self.raster_scene.invalidate()
+        self.frame.invalidate()
+
+    def rehello(self):
+        """Handshake again; returns False and schedules a retry if the device does not answer."""
+        drained = self.writer.drain(timeout=2.0)
+        try:
+            if not drained or self.writer.error is not None:
+                # The hello must not land in the middle of a frame still being written
+                raise RuntimeError("frame writer did not finish")
+            select_protocol(self.ser, "binary")
+        except RuntimeError:
+            # Busy or still booting: treat like a flow timeout and back off
+            if self.flow is not None:
+                self.flow.expire()
+            self.hello_failures += 1
+            self.hello_pending = True
+            self.hello_retry_at = time.monotonic() + self.hello_backoff
+            print(f"DEBUG: {self.port} did not answer the handshake, retrying in {self.hello_backoff:.0f} s")
+            self.hello_backoff = min(self.hello_backoff * 2, RETRY_MAX_SEC)
+            return False
+        self.hello_pending = False
+        self.hello_backoff = RETRY_SEC
+        self.last_write = time.monotonic()
+        if self.flow is not None:
+            self.flow.enable()
+        return True
+
+    def summary(self):
+        return (f"{self.frames} frames, {self.superseded} superseded, {self.unchanged} unchanged, "
+                f"{self.writer.frames} written, {self.writer.replaced} replaced, {self.writer.merged} merged, "
+                f"{self.hello_failures} failed handshakes, {self.failures} failures, {self.dropped} dropped")
+
+    def render(self, stats, frame_time):
+        started = time.perf_counter()
+        args, flow, writer = self.args, self.flow, self.writer
+        if self.last_layout_switch is None:
+            self.last_layout_switch = frame_time
+        # Check if we should cycle layouts
+        if not args.no_cycle and frame_time - self.last_layout_switch >= LAYOUT_CYCLE_SEC:
+            self.layout_idx = (self.layout_idx + 1) % len(self.plans)
+            self.last_layout_switch = frame_time
+            if args.verbose:
+                print(f"{self.port}: {self.summary()}")
+        plan = self.plans[self.layout_idx]
+        if self.hello_pending:
+            # A handshake failed; nothing is sent until one succeeds
+            if time.monotonic() < self.hello_retry_at or not self.rehello():
+                self.frames += 1
+                return
+            self.invalidate()
+        if self.protocol == "binary" and time.monotonic() - self.last_write > SESSION_IDLE_SEC / 2:
+            # Keep the device's binary session alive across long intervals
+            if not self.rehello():
+                self.frames += 1
+                return
+        if time.monotonic() - self.last_full_redraw >= FULL_REDRAW_SEC:
+            # Periodic full redraw recovers from a device reset
+            self.invalidate()
+            self.last_full_redraw = time.monotonic()
+        sent = False
+        timeouts = flow.timeouts if flow is not None else 0
+        if flow is not None and not flow.ready():
+            # The device is still busy; skip this frame. The scene keeps
+            # what was last sent, so the next frame carries the changes.
+            if args.verbose:
+                print(f"{self.port} {plan.name}: skipped, {flow.in_flight} frames in flight")
+        else:
+            if flow is not None and flow.timeouts != timeouts:
+                # No acks for a while: the device may have reset
+                if not self.rehello():
+                    self.frames += 1
+                    return
+                self.invalidate()
+            draw_started = time.perf_counter()
+            if args.render == "full":
+                draw_layout(self.frame, plan, stats)
+                sent = True
+            elif args.render == "raster":
+                sent = draw_layout_raster(self.frame, self.raster_scene, plan, stats)
+            else:
+                sent = draw_layout_incremental(self.frame, self.scene, plan, stats)
+            # Identical to the frame before it: neither sent nor shown
+            sent = sent and not self.frame.last_frame_skipped
+            if not sent:
+                self.unchanged += 1
+            timers.add(f"draw/{plan.name}", time.perf_counter() - draw_started)
+        self.frames += 1
+        if sent:
+            self.last_write = time.monotonic()
+        if writer.resync:
+            # The writer dropped a backlog of partial frames
+            writer.resync = False
+            self.invalidate()
+        if sent and args.verbose:
+            print(f"{self.port} {plan.name}: {self.frame.last_frame_commands} commands, "
+                  f"{self.frame.last_frame_bytes} bytes")
+        timers.add(f"display/{self.port}", time.perf_counter() - started)
+
+
+def stop(signum, frame):
+    raise KeyboardInterrupt
 
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--port", required=True, help="Serial port (e.g., COM8)")
+    parser.add_argument("--port", action="append", required=True, metavar="PORT[=LAYOUT,...]",
+                        help="Serial port (e.g., COM8), optionally with the layouts to show on it "
+                             "(e.g., \"COM9=Trends,Gaming Focus\"); repeat for more displays")
     parser.add_argument("--baud", type=int, default=DEFAULT_BAUD)
     parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_SEC)
     parser.add_argument("--no-cycle", action="store_true", help="Don't cycle layouts, stay on first")
+    parser.add_argument("--protocol", choices=["auto", "binary", "csv"], default=WIRE_PROTOCOL,
+                        help="Wire format; auto uses binary when the device supports it")
+    parser.add_argument("--render", choices=["incremental", "full", "raster"], default="incremental",
+                        help="Redraw only changed widgets, the whole layout every frame, "
+                             "or rasterize on the host and send pixels")
+    parser.add_argument("--window", type=int, default=FLOW_WINDOW,
+                        help="Frames in flight before waiting for device acks; 0 disables flow control")
+    parser.add_argument("--subscribe", nargs="?", const=STATS_BUS_NAME, metavar="NAME",
+                        help="Read stats published by stats_bus.py instead of collecting them here")
+    parser.add_argument("--record-stats", metavar="FILE",
+                        help="Save every stats snapshot to a trace file for --replay-stats and bench_render.py")
+    parser.add_argument("--replay-stats", metavar="FILE",
+                        help="Render a recorded stats trace in real time instead of live stats")
+    parser.add_argument("--record", metavar="FILE",
+                        help="Save every frame written, with timestamps, for replay_capture.py")
+    parser.add_argument("--timings", metavar="FILE",
+                        help="Write per-stage p50/p95/p99 timings to FILE as JSON every few seconds")
+    parser.add_argument("--profile", type=int, metavar="N",
+                        help="Run N frames under cProfile, write the profile and collapsed stacks, and exit")
+    parser.add_argument("--profile-output", default="pc_stats_profile",
+                        help="Path prefix for --profile output (.prof and .collapsed)")
+    parser.add_argument("--verbose", action="store_true", help="Print bytes and commands sent per frame")
     args = parser.parse_args()
-
-    pynvml.nvmlInit()
-    gpu_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-
-    current_layout_idx = 0
-    last_layout_switch = time.time()
-
-    with serial.Serial(args.port, args.baud, timeout=1) as ser:
+    try:
+        specs = [parse_display(spec) for spec in args.port]
+    except ValueError as e:
+        parser.error(str(e))
+    history = None
+    if any(widget["type"] == "graph" for _, layouts in specs for layout in layouts for widget in layout["widgets"]):
+        # A replayed trace must not end up in the saved history
+        history = StatHistory(HISTORY_SIZE) if args.replay_stats else open_history()
+    displays = [Display(port, layouts, args, history) for port, layouts in specs]
+
+    # One collector feeds every display, so sampling cost doesn't grow with them
+    if args.replay_stats:
+        collector = StatsReplay(args.replay_stats, history)
+        print(f"Replaying {len(collector.samples)} samples ({collector.duration:.0f} s) from {args.replay_stats}")
+    elif args.subscribe:
+        try:
+            collector = StatsSubscriber(args.subscribe, history, STALE_AFTER_SEC)
+        except FileNotFoundError:
+            parser.error(f"No stats bus named {args.subscribe}; start stats_bus.py first")
+        print(f"Subscribed to stats bus {args.subscribe} ({len(collector.keys)} stats)")
+    else:
+        gpu_count = gpu_reader.start()
+        print(f"GPUs: {', '.join(gpu_reader.names) if gpu_count else 'none'}")
+        collector = build_collector(args.interval, history)
+        collector.start()
+
+    scheduler = FrameScheduler(args.interval)
+
+    with contextlib.ExitStack() as stack:
+        # Unwind on SIGTERM like on Ctrl+C, so recordings are closed and
+        # PresentMon is reaped
+        signal.signal(signal.SIGTERM, stop)
+        stack.callback(close_sources)
+        if isinstance(collector, StatsCollector):
+            stack.callback(collector.stop)
+        ports = [stack.enter_context(serial.Serial(display.port, args.baud, timeout=1)) for display in displays]
         time.sleep(2)
         pid = os.getpid()
         print(f"Sender PID: {pid}")
         pid_path = Path(__file__).with_name("sender.pid")
         pid_path.write_text(f"{pid}\n", encoding="utf-8")
+        stats_recorder = None
+        if args.record_stats:
+            stats_recorder = StatsRecorder(args.record_stats)
+            stack.callback(stats_recorder.close)
+        recorder = None
+        if args.record:
+            recorder = FrameRecorder(args.record)
+            stack.callback(recorder.close)
+        for display, ser in zip(displays, ports):
+            display.connect(ser, recorder)
+            if not args.profile:
+                # Under --profile everything renders on this thread so cProfile sees it
+                display.start()
+
+        def export_timings():
+            timers.export(args.timings, scheduler=scheduler.stats())
+
+        def dump_timings(signum, frame):
+            print(timers.summary(), flush=True)
+            print(f"Scheduler: {scheduler.summary(histogram=True)}", flush=True)
+            if args.timings:
+                export_timings()
+
+        # Dump the stage timings on demand (Ctrl+Break on Windows)
+        dump_signal = getattr(signal, "SIGUSR1", None) or getattr(signal, "SIGBREAK", None)
+        if dump_signal is not None:
+            signal.signal(dump_signal, dump_timings)
+        profiler = cProfile.Profile() if args.profile else None
+        frame_time = last_summary = scheduler.wait()
         while True:
-            # Check if we should cycle layouts
-            if not args.no_cycle and time.time() - last_layout_switch >= LAYOUT_CYCLE_SEC:
-                current_layout_idx = (current_layout_idx + 1) % len(LAYOUTS)
-                last_layout_switch = time.time()
-            
-            stats = gather_stats(gpu_handle)
-            layout = LAYOUTS[current_layout_idx]
-            draw_layout(ser, layout, stats)
-            time.sleep(args.interval)
+            if profiler is not None:
+                profiler.enable()
+            started = time.perf_counter()
+            stats = collector.snapshot()
+            timers.add("snapshot", time.perf_counter() - started)
+            if stats_recorder is not None:
+                stats_recorder.record(stats, frame_time)
+            for display in displays:
+                display.update(stats, frame_time)
+            if profiler is not None:
+                profiler.disable()
+                if scheduler.frames >= args.profile:
+                    break
+            if frame_time - last_summary >= LAYOUT_CYCLE_SEC:
+                last_summary = frame_time
+                if args.timings:
+                    export_timings()
+                if args.verbose:
+                    print(f"Scheduler: {scheduler.summary()}")
+            if collector.stale and args.verbose:
+                print(f"Stale sources: {', '.join(collector.stale)}")
+            frame_time = scheduler.wait()
+        for display in displays:
+            display.writer.drain(timeout=2.0)
+    profiler.dump_stats(f"{args.profile_output}.prof")
+    write_collapsed(pstats.Stats(profiler).stats, f"{args.profile_output}.collapsed")
+    print(f"Profiled {args.profile} frames: {args.profile_output}.prof, {args.profile_output}.collapsed")
+    print(timers.summary())
+    print(f"Scheduler: {scheduler.summary(histogram=True)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+# Streaming PresentMon reader
+#
+# PresentMon is started once and its CSV output is read line by line from
+# stdout on a background thread. Frame times go into a bounded ring buffer and
+# FPS figures are computed over a rolling time window on demand. The process
+# is restarted if it exits (e.g. the game was not running yet).
+
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+# Frame time columns, in order of preference (PresentMon 1.x, then 2.x names)
+FRAMETIME_COLUMNS = ("msbetweenpresents", "frametime", "msbetweendisplaychange")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class PresentMonReader:
+    """Keep one PresentMon process running and summarize its frame times.
+
+    ``command`` is the full argument list. Scripts ending in ``.py`` are run
+    with the current interpreter, which is handy for a fake PresentMon.
+    """
+
+    def __init__(self, command, window_sec=2.0, max_samples=4096, restart_delay=2.0):
+        if command and command[0].lower().endswith(".py"):
+            command = [sys.executable] + list(command)
+        self.command = list(command)
+        self.window_sec = window_sec
+        self.restart_delay = restart_delay
+        self.samples = deque(maxlen=max_samples)
+        self.process = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="presentmon", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.process = subprocess.Popen(
+                    self.command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    stdin=subprocess.DEVNULL,
+                    text=True,
+                    errors="ignore",
+                    bufsize=1,
+                )
+                self._consume(self.process.stdout)
+                self.process.wait()
+            except Exception as e:
+                print(f"DEBUG: PresentMon error: {e}")
+            self._stop.wait(self.restart_delay)
+
+    def _consume(self, stream):
+        column = None
+        for line in stream:
+            fields = line.strip().split(",")
+            try:
+                frametime = float(fields[column]) if column is not None else None
+            except (ValueError, IndexError):
+                frametime = None
+            if frametime is None:
+                # Header line; PresentMon repeats it when it restarts a session
+                names = [name.strip().lower() for name in fields]
+                for candidate in FRAMETIME_COLUMNS:
+                    if candidate in names:
+                        column = names.index(candidate)
+                        break
+                continue
+            if frametime > 0:
+                with self._lock:
+                    self.samples.append((time.monotonic(), frametime))
+
+    def stats(self, now=None):
+        """Rolling FPS summary over the last ``window_sec`` seconds."""
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.window_sec
+        with self._lock:
+            frametimes = sorted(ft for stamp, ft in self.samples if stamp >= cutoff)
+        if not frametimes:
+            return {"fps": None, "fps_low": None, "frametime_p50_ms": None,
+                    "frametime_p95_ms": None, "frametime_p99_ms": None}
+        p99 = percentile(frametimes, 99)
+        return {
+            "fps": 1000.0 * len(frametimes) / sum(frametimes),
+            # 1% low: the frame rate at the 99th percentile frame time
+            "fps_low": 1000.0 / p99,
+            "frametime_p50_ms": percentile(frametimes, 50),
+            "frametime_p95_ms": percentile(frametimes, 95),
+            "frametime_p99_ms": p99,
+        }
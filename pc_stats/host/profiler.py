@@ -0,0 +1,120 @@
+# Sender profiling
+#
+# StageTimers collects how long each stage of a frame took (source reads,
+# snapshot, drawing per layout, serial writes). Recording a duration is one
+# deque append under a lock; percentiles over the last ``samples`` durations
+# are only worked out when a summary or JSON export is asked for.
+#
+# collapsed_stacks turns a cProfile run into the "frame;frame;frame weight"
+# lines flame graph tools read. cProfile only keeps caller -> callee edges, so
+# deeper stacks are reconstructed by splitting each function's time across
+# its callers in proportion to the time each edge accounts for.
+
+import json
+import os
+import threading
+from collections import defaultdict, deque
+
+MAX_STACK_DEPTH = 64
+# Stack branches worth less than this many seconds are not expanded further
+MIN_STACK_SEC = 1e-6
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class StageTimers:
+    """Rolling durations per named stage."""
+
+    def __init__(self, samples=1024):
+        self.samples = samples
+        self.recent = {}
+        self.counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        # Called from the collector, display and frame-writer threads
+        with self._lock:
+            recent = self.recent.get(stage)
+            if recent is None:
+                recent = self.recent[stage] = deque(maxlen=self.samples)
+            recent.append(seconds)
+            self.counts[stage] += 1
+
+    def stats(self):
+        """Return ``{stage: {count, p50_ms, p95_ms, p99_ms, max_ms}}`` over the recent durations."""
+        with self._lock:
+            snapshot = [(stage, list(recent), self.counts[stage]) for stage, recent in sorted(self.recent.items())]
+        result = {}
+        for stage, recent, count in snapshot:
+            ordered = sorted(seconds * 1000 for seconds in recent)
+            if not ordered:
+                continue
+            result[stage] = {
+                "count": count,
+                "p50_ms": percentile(ordered, 50),
+                "p95_ms": percentile(ordered, 95),
+                "p99_ms": percentile(ordered, 99),
+                "max_ms": ordered[-1],
+            }
+        return result
+
+    def summary(self):
+        lines = [f"{'stage':<36} {'count':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+        for stage, row in self.stats().items():
+            lines.append(f"{stage:<36} {row['count']:8d} {row['p50_ms']:8.3f} {row['p95_ms']:8.3f} "
+                         f"{row['p99_ms']:8.3f} {row['max_ms']:8.3f}")
+        return "\n".join(lines)
+
+    def export(self, path, **sections):
+        """Write ``{"stages": stats(), **sections}`` to ``path`` as JSON, replacing the file atomically."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as handle:
+            json.dump({"stages": self.stats(), **sections}, handle, indent=2)
+        os.replace(tmp, path)
+
+
+def frame_label(func):
+    filename, line, name = func
+    if filename == "~":
+        # Built-ins have no file
+        return name
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+
+def collapsed_stacks(stats):
+    """Return ``{"a;b;c": self seconds}`` from a ``pstats.Stats(...).stats`` dict."""
+    callees = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]
+    stacks = defaultdict(float)
+
+    def walk(func, stack, funcs, share):
+        _, _, self_time, total_time, _ = stats[func]
+        stack = stack + (frame_label(func),)
+        stacks[";".join(stack)] += self_time * share
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, {}).items():
+            callee_total = stats[callee][3]
+            callee_share = share * edge_time / callee_total if callee_total else 0.0
+            # Recursion is folded into the first occurrence
+            if callee in funcs or callee_share * callee_total < MIN_STACK_SEC:
+                continue
+            walk(callee, stack, funcs | {callee}, callee_share)
+
+    for func, row in stats.items():
+        if not row[4]:
+            walk(func, (), frozenset((func,)), 1.0)
+    return stacks
+
+
+def write_collapsed(stats, path):
+    """Write collapsed stacks with integer microsecond weights."""
+    with open(path, "w", encoding="utf-8") as handle:
+        for stack, seconds in sorted(collapsed_stacks(stats).items()):
+            weight = round(seconds * 1e6)
+            if weight > 0:
+                handle.write(f"{stack} {weight}\n")
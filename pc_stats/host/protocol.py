@@ -0,0 +1,365 @@
+# Wire protocol for the PC stats display
+#
+# Two encodings are understood by the device:
+#   - CSV lines ("text,CPU,10,40,0\n"), kept as a fallback and for manual
+#     debugging from a serial terminal.
+#   - Binary packets: one opcode byte (always >= 0x80, so it can never be the
+#     start of a CSV line) followed by a fixed little-endian payload. Strings
+#     are ASCII, length-prefixed with a single byte; "blit" is followed by w * h
+#     little-endian RGB565 pixels.
+#
+# The device answers a CSV "hello" line with "hello,<version>[,<cap>...]",
+# which lets the host detect binary support and fall back to CSV when talking
+# to older firmware. Optional commands such as "blit" and "arc" are only used
+# when the device lists them as capabilities.
+#
+# Devices that list "ack" reply with an "ack" line after every show once the
+# host sends "acks,1". FlowControl uses these to bound the frames in flight.
+
+import hashlib
+import struct
+import threading
+import time
+
+PROTOCOL_VERSION = 1
+
+# The device re-enables Ctrl-C after this long without input, ending the
+# binary session. Hosts that go quiet for longer must say hello again.
+SESSION_IDLE_SEC = 30.0
+
+OP_FILL = 0x80
+OP_PIXEL = 0x81
+OP_HLINE = 0x82
+OP_VLINE = 0x83
+OP_LINE = 0x84
+OP_RECT = 0x85
+OP_FILL_RECT = 0x86
+OP_CIRCLE = 0x87
+OP_TEXT = 0x88
+OP_SHOW = 0x89
+OP_BLIT = 0x8A
+OP_ARC = 0x8B
+
+# Command name -> (opcode, struct format of the fixed part of the payload)
+BINARY_COMMANDS = {
+    "fill": (OP_FILL, "<H"),
+    "pixel": (OP_PIXEL, "<hhH"),
+    "hline": (OP_HLINE, "<hhhH"),
+    "vline": (OP_VLINE, "<hhhH"),
+    "line": (OP_LINE, "<hhhhH"),
+    "rect": (OP_RECT, "<hhhhH"),
+    "fill_rect": (OP_FILL_RECT, "<hhhhH"),
+    "circle": (OP_CIRCLE, "<hhhH"),
+    "text": (OP_TEXT, "<hhH"),
+    "show": (OP_SHOW, ""),
+    "blit": (OP_BLIT, "<hhhh"),
+    "arc": (OP_ARC, "<hhhhhhH"),
+}
+
+_STRUCTS = {cmd: (bytes([op]), struct.Struct(fmt)) for cmd, (op, fmt) in BINARY_COMMANDS.items()}
+
+
+def encode_csv(cmd, *args):
+    """Encode a command as a CSV line."""
+    return (",".join([cmd] + [str(arg) for arg in args]) + "\n").encode("utf-8")
+
+
+def encode_binary(cmd, *args):
+    """Encode a command as a binary packet.
+
+    Commands without a binary opcode are sent as CSV so the device can still
+    execute them through its generic fallback path.
+    """
+    entry = _STRUCTS.get(cmd)
+    if entry is None:
+        return encode_csv(cmd, *args)
+    opcode, packer = entry
+    if cmd == "text":
+        text, x, y, color = args
+        # The device font is ASCII-only; one byte per character also keeps
+        # the 255-byte cut from splitting a character
+        data = str(text).encode("ascii", errors="replace")[:255]
+        return opcode + packer.pack(x, y, color) + bytes([len(data)]) + data
+    if cmd == "blit":
+        x, y, w, h, pixels = args
+        return opcode + packer.pack(x, y, w, h) + bytes(pixels)
+    return opcode + packer.pack(*args)
+
+
+ENCODERS = {
+    "csv": encode_csv,
+    "binary": encode_binary,
+}
+
+
+def negotiate(ser, timeout=1.0):
+    """Ask the device which protocol version it speaks.
+
+    Returns ``(version, caps)`` or ``None`` when the device did not answer,
+    which is the case for firmware that only understands CSV.
+    """
+    ser.reset_input_buffer()
+    ser.write(encode_csv("hello", PROTOCOL_VERSION))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        line = ser.readline().decode("utf-8", errors="ignore").strip()
+        if not line.startswith("hello,"):
+            continue
+        parts = line.split(",")
+        try:
+            version = int(parts[1])
+        except (IndexError, ValueError):
+            return None
+        return version, set(parts[2:])
+    return None
+
+
+class FlowControl:
+    """Credit-based pacing from the device's per-frame acks.
+
+    At most ``window`` frames may be unacknowledged. When the window is full
+    the caller skips the frame; with the retained scene the next frame then
+    carries the merged changes. If no ack arrives for ``timeout`` seconds the
+    device is assumed to have reset and the credits are restored.
+    """
+
+    def __init__(self, ser, window=2, timeout=2.0, clock=time.monotonic):
+        self.ser = ser
+        self.window = window
+        self.timeout = timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.last_progress = clock()
+        self.pending = bytearray()
+        self.acked = 0
+        self.dropped = 0
+        self.timeouts = 0
+
+    def enable(self):
+        """Ask the device for acks; call after every handshake."""
+        self.ser.write(encode_csv("acks", 1))
+        self.reset()
+
+    def expire(self):
+        """Give up on the frames in flight: count a timeout and restore the credits."""
+        self.timeouts += 1
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.in_flight = 0
+            self.pending.clear()
+            self.last_progress = self.clock()
+
+    def poll(self):
+        """Consume the acks that have arrived without blocking."""
+        waiting = self.ser.in_waiting
+        if not waiting:
+            return
+        self.pending += self.ser.read(waiting)
+        *lines, rest = self.pending.split(b"\n")
+        self.pending = bytearray(rest)
+        acks = sum(1 for line in lines if line.strip() == b"ack")
+        if acks:
+            with self.lock:
+                self.acked += acks
+                self.in_flight = max(self.in_flight - acks, 0)
+                self.last_progress = self.clock()
+
+    def ready(self):
+        """Return True if a frame may be sent now; counts a drop otherwise."""
+        self.poll()
+        if self.in_flight < self.window:
+            return True
+        if self.clock() - self.last_progress > self.timeout:
+            self.expire()
+            return True
+        self.dropped += 1
+        return False
+
+    def sent(self):
+        # May be called from the writer thread
+        with self.lock:
+            if self.in_flight == 0:
+                self.last_progress = self.clock()
+            self.in_flight += 1
+
+
+class FrameWriter:
+    """Write frames on a background thread through a one-slot mailbox.
+
+    The render loop hands each finished frame to ``submit`` and moves on to
+    the next one while this frame is written. A frame that has not been
+    picked up yet is superseded: a keyframe (one that starts by filling the
+    screen) replaces it, any other frame is appended to it with the earlier
+    trailing ``show`` removed, so no drawing is lost and the device only
+    presents the newest state.
+    """
+
+    def __init__(self, ser, show=b"", flow=None, max_pending=256 * 1024, timers=None, stage="write", record=None):
+        self.ser = ser
+        self.show = bytes(show)
+        self.flow = flow
+        # Optional StageTimers; each write is timed under ``stage``
+        self.timers = timers
+        self.stage = stage
+        # Optional callable that gets every chunk written (--record)
+        self.record = record
+        self.max_pending = max_pending
+        self.cond = threading.Condition()
+        self.pending = None
+        self.busy = False
+        self.running = False
+        self.thread = None
+        self.frames = 0
+        self.replaced = 0
+        self.merged = 0
+        # Set when merged frames were discarded; the caller must redraw everything
+        self.resync = False
+        # First write error; the thread stops and later frames are dropped
+        self.error = None
+        self.dropped = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+
+    def submit(self, data, keyframe=False):
+        if self.error is not None:
+            # The owner checks ``error`` and sets up a new writer
+            self.dropped += 1
+            return
+        with self.cond:
+            if self.pending is None:
+                self.pending = bytearray(data)
+            elif keyframe:
+                self.pending = bytearray(data)
+                self.replaced += 1
+            elif len(self.pending) + len(data) > self.max_pending:
+                # The link is stalled; drop the backlog and ask for a keyframe
+                self.pending = None
+                self.resync = True
+                self.replaced += 1
+            else:
+                if self.show and self.pending.endswith(self.show):
+                    del self.pending[-len(self.show):]
+                self.pending += data
+                self.merged += 1
+            self.cond.notify_all()
+
+    def drain(self, timeout=None):
+        """Wait until everything submitted has been written."""
+        with self.cond:
+            return self.cond.wait_for(lambda: (self.pending is None or self.error is not None) and not self.busy,
+                                      timeout)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending is not None or not self.running)
+                if self.pending is None:
+                    return
+                data, self.pending = self.pending, None
+                self.busy = True
+            try:
+                started = time.perf_counter()
+                self.ser.write(data)
+                if self.timers is not None:
+                    self.timers.add(self.stage, time.perf_counter() - started)
+                if self.record is not None:
+                    self.record(data)
+                self.frames += 1
+                if self.flow is not None:
+                    self.flow.sent()
+            except Exception as e:
+                self.error = e
+            finally:
+                with self.cond:
+                    self.busy = False
+                    self.cond.notify_all()
+            if self.error is not None:
+                return
+
+
+class FrameBuilder:
+    """Collect the commands of one frame and write them in a single call.
+
+    Commands are encoded into a preallocated buffer; ``show`` appends the
+    final command and flushes everything with one ``ser.write``.
+
+    With ``skip_unchanged`` every frame is fingerprinted, and a frame that
+    encodes to the same bytes as the one sent before it is dropped, show
+    included, so the device neither receives it nor refreshes the panel.
+    The encoded bytes are the quantized widget output (formatted text, bar
+    widths in pixels), so equal fingerprints mean nothing visible changed.
+    Call ``invalidate`` when the device may have lost what it showed.
+    """
+
+    def __init__(self, ser, encode=encode_csv, caps=(), capacity=64 * 1024, flow=None, skip_unchanged=False):
+        self.ser = ser
+        # FrameWriter takes frames through submit() so it can tell keyframes apart
+        self.submit = getattr(ser, "submit", None)
+        self.flow = flow
+        self.encode = encode
+        self.caps = frozenset(caps)
+        self.buffer = bytearray(capacity)
+        self.length = 0
+        self.commands = 0
+        self.keyframe = False
+        self.skip_unchanged = skip_unchanged
+        self.fingerprint = None
+        self.skipped = 0
+        self.last_frame_skipped = False
+        self.last_frame_bytes = 0
+        self.last_frame_commands = 0
+
+    def add(self, cmd, *args):
+        data = self.encode(cmd, *args)
+        end = self.length + len(data)
+        if end > len(self.buffer):
+            self.buffer.extend(bytes(max(end - len(self.buffer), len(self.buffer))))
+        self.buffer[self.length:end] = data
+        self.length = end
+        if self.commands == 0:
+            self.keyframe = cmd == "fill"
+        self.commands += 1
+        if cmd == "show":
+            self.flush()
+
+    def invalidate(self):
+        """Forget the last fingerprint so the next frame is always sent."""
+        self.fingerprint = None
+
+    def flush(self):
+        """Write the pending frame, if any, and reset the buffer."""
+        self.last_frame_skipped = False
+        if self.length and self.skip_unchanged:
+            fingerprint = hashlib.blake2b(memoryview(self.buffer)[:self.length], digest_size=16).digest()
+            if fingerprint == self.fingerprint:
+                self.skipped += 1
+                self.last_frame_skipped = True
+                self.length = 0
+                self.commands = 0
+                self.last_frame_bytes = 0
+                self.last_frame_commands = 0
+                return
+            self.fingerprint = fingerprint
+        if self.length and self.submit is not None:
+            self.submit(memoryview(self.buffer)[:self.length], self.keyframe)
+        elif self.length:
+            self.ser.write(memoryview(self.buffer)[:self.length])
+            if self.flow is not None:
+                self.flow.sent()
+        self.last_frame_bytes = self.length
+        self.last_frame_commands = self.commands
+        self.length = 0
+        self.commands = 0
@@ -0,0 +1,298 @@
+# Host-side rasterizer producing RGB565 frames
+#
+# Raster implements the same drawing primitives as the device's
+# framebuf.FrameBuffer (plus a filled "arc" ring) on a 240x240 uint16 NumPy
+# array, so the regular draw functions can render into it. RasterScene then
+# sends only the changed screen bands to the device as raw pixel data, which
+# makes the cost of a frame independent of how many primitives it contains.
+
+import numpy as np
+
+FONT_W = 8
+FONT_H = 8
+
+# MicroPython's built-in framebuf font (font_petme128_8x8) for characters
+# 32-127. Each glyph is 8 column bytes, least significant bit at the top.
+FONT_8X8 = b"".join([
+    b"\x00\x00\x00\x00\x00\x00\x00\x00"  # 32 ' '
+    b"\x00\x00\x00\x4f\x4f\x00\x00\x00"  # 33 '!'
+    b"\x00\x07\x07\x00\x00\x07\x07\x00"  # 34 '"'
+    b"\x14\x7f\x7f\x14\x14\x7f\x7f\x14"  # 35 '#'
+    b"\x00\x24\x2e\x6b\x6b\x3a\x12\x00"  # 36 '$'
+    b"\x00\x63\x33\x18\x0c\x66\x63\x00"  # 37 '%'
+    b"\x00\x32\x7f\x4d\x4d\x77\x72\x50"  # 38 '&'
+    b"\x00\x00\x00\x04\x06\x03\x01\x00"  # 39 "'"
+    b"\x00\x00\x1c\x3e\x63\x41\x00\x00"  # 40 '('
+    b"\x00\x00\x41\x63\x3e\x1c\x00\x00"  # 41 ')'
+    b"\x08\x2a\x3e\x1c\x1c\x3e\x2a\x08"  # 42 '*'
+    b"\x00\x08\x08\x3e\x3e\x08\x08\x00"  # 43 '+'
+    b"\x00\x00\x80\xe0\x60\x00\x00\x00"  # 44 ','
+    b"\x00\x08\x08\x08\x08\x08\x08\x00"  # 45 '-'
+    b"\x00\x00\x00\x60\x60\x00\x00\x00"  # 46 '.'
+    b"\x00\x40\x60\x30\x18\x0c\x06\x02"  # 47 '/'
+    b"\x00\x3e\x7f\x49\x45\x7f\x3e\x00"  # 48 '0'
+    b"\x00\x40\x44\x7f\x7f\x40\x40\x00"  # 49 '1'
+    b"\x00\x62\x73\x51\x49\x4f\x46\x00"  # 50 '2'
+    b"\x00\x22\x63\x49\x49\x7f\x36\x00"  # 51 '3'
+    b"\x00\x18\x18\x14\x16\x7f\x7f\x10"  # 52 '4'
+    b"\x00\x27\x67\x45\x45\x7d\x39\x00"  # 53 '5'
+    b"\x00\x3e\x7f\x49\x49\x7b\x32\x00"  # 54 '6'
+    b"\x00\x03\x03\x79\x7d\x07\x03\x00"  # 55 '7'
+    b"\x00\x36\x7f\x49\x49\x7f\x36\x00"  # 56 '8'
+    b"\x00\x26\x6f\x49\x49\x7f\x3e\x00"  # 57 '9'
+    b"\x00\x00\x00\x24\x24\x00\x00\x00"  # 58 ':'
+    b"\x00\x00\x80\xe4\x64\x00\x00\x00"  # 59 ';'
+    b"\x00\x08\x1c\x36\x63\x41\x41\x00"  # 60 '<'
+    b"\x00\x14\x14\x14\x14\x14\x14\x00"  # 61 '='
+    b"\x00\x41\x41\x63\x36\x1c\x08\x00"  # 62 '>'
+    b"\x00\x02\x03\x51\x59\x0f\x06\x00"  # 63 '?'
+    b"\x00\x3e\x7f\x41\x4d\x4f\x2e\x00"  # 64 '@'
+    b"\x00\x7c\x7e\x0b\x0b\x7e\x7c\x00"  # 65 'A'
+    b"\x00\x7f\x7f\x49\x49\x7f\x36\x00"  # 66 'B'
+    b"\x00\x3e\x7f\x41\x41\x63\x22\x00"  # 67 'C'
+    b"\x00\x7f\x7f\x41\x63\x3e\x1c\x00"  # 68 'D'
+    b"\x00\x7f\x7f\x49\x49\x41\x41\x00"  # 69 'E'
+    b"\x00\x7f\x7f\x09\x09\x01\x01\x00"  # 70 'F'
+    b"\x00\x3e\x7f\x41\x49\x7b\x3a\x00"  # 71 'G'
+    b"\x00\x7f\x7f\x08\x08\x7f\x7f\x00"  # 72 'H'
+    b"\x00\x00\x41\x7f\x7f\x41\x00\x00"  # 73 'I'
+    b"\x00\x20\x60\x41\x7f\x3f\x01\x00"  # 74 'J'
+    b"\x00\x7f\x7f\x1c\x36\x63\x41\x00"  # 75 'K'
+    b"\x00\x7f\x7f\x40\x40\x40\x40\x00"  # 76 'L'
+    b"\x00\x7f\x7f\x06\x0c\x06\x7f\x7f"  # 77 'M'
+    b"\x00\x7f\x7f\x0e\x1c\x7f\x7f\x00"  # 78 'N'
+    b"\x00\x3e\x7f\x41\x41\x7f\x3e\x00"  # 79 'O'
+    b"\x00\x7f\x7f\x09\x09\x0f\x06\x00"  # 80 'P'
+    b"\x00\x1e\x3f\x21\x61\x7f\x5e\x00"  # 81 'Q'
+    b"\x00\x7f\x7f\x19\x39\x6f\x46\x00"  # 82 'R'
+    b"\x00\x26\x6f\x49\x49\x7b\x32\x00"  # 83 'S'
+    b"\x00\x01\x01\x7f\x7f\x01\x01\x00"  # 84 'T'
+    b"\x00\x3f\x7f\x40\x40\x7f\x3f\x00"  # 85 'U'
+    b"\x00\x1f\x3f\x60\x60\x3f\x1f\x00"  # 86 'V'
+    b"\x00\x7f\x7f\x30\x18\x30\x7f\x7f"  # 87 'W'
+    b"\x00\x63\x77\x1c\x1c\x77\x63\x00"  # 88 'X'
+    b"\x00\x07\x0f\x78\x78\x0f\x07\x00"  # 89 'Y'
+    b"\x00\x61\x71\x59\x4d\x47\x43\x00"  # 90 'Z'
+    b"\x00\x00\x7f\x7f\x41\x41\x00\x00"  # 91 '['
+    b"\x00\x02\x06\x0c\x18\x30\x60\x40"  # 92 '\\'
+    b"\x00\x00\x41\x41\x7f\x7f\x00\x00"  # 93 ']'
+    b"\x00\x08\x0c\x06\x06\x0c\x08\x00"  # 94 '^'
+    b"\xc0\xc0\xc0\xc0\xc0\xc0\xc0\xc0"  # 95 '_'
+    b"\x00\x00\x01\x03\x06\x04\x00\x00"  # 96 '`'
+    b"\x00\x20\x74\x54\x54\x7c\x78\x00"  # 97 'a'
+    b"\x00\x7f\x7f\x44\x44\x7c\x38\x00"  # 98 'b'
+    b"\x00\x38\x7c\x44\x44\x6c\x28\x00"  # 99 'c'
+    b"\x00\x38\x7c\x44\x44\x7f\x7f\x00"  # 100 'd'
+    b"\x00\x38\x7c\x54\x54\x5c\x58\x00"  # 101 'e'
+    b"\x00\x08\x7e\x7f\x09\x03\x02\x00"  # 102 'f'
+    b"\x00\x98\xbc\xa4\xa4\xfc\x7c\x00"  # 103 'g'
+    b"\x00\x7f\x7f\x04\x04\x7c\x78\x00"  # 104 'h'
+    b"\x00\x00\x00\x7d\x7d\x00\x00\x00"  # 105 'i'
+    b"\x00\x40\xc0\x80\x80\xfd\x7d\x00"  # 106 'j'
+    b"\x00\x7f\x7f\x30\x38\x6c\x44\x00"  # 107 'k'
+    b"\x00\x00\x41\x7f\x7f\x40\x00\x00"  # 108 'l'
+    b"\x00\x7c\x7c\x18\x30\x18\x7c\x7c"  # 109 'm'
+    b"\x00\x7c\x7c\x04\x04\x7c\x78\x00"  # 110 'n'
+    b"\x00\x38\x7c\x44\x44\x7c\x38\x00"  # 111 'o'
+    b"\x00\xfc\xfc\x24\x24\x3c\x18\x00"  # 112 'p'
+    b"\x00\x18\x3c\x24\x24\xfc\xfc\x00"  # 113 'q'
+    b"\x00\x7c\x7c\x04\x04\x0c\x08\x00"  # 114 'r'
+    b"\x00\x48\x5c\x54\x54\x74\x20\x00"  # 115 's'
+    b"\x04\x04\x3f\x7f\x44\x64\x20\x00"  # 116 't'
+    b"\x00\x3c\x7c\x40\x40\x7c\x3c\x00"  # 117 'u'
+    b"\x00\x1c\x3c\x60\x60\x3c\x1c\x00"  # 118 'v'
+    b"\x00\x1c\x7c\x30\x18\x30\x7c\x1c"  # 119 'w'
+    b"\x00\x44\x6c\x38\x38\x6c\x44\x00"  # 120 'x'
+    b"\x00\x9c\xbc\xa0\xa0\xfc\x7c\x00"  # 121 'y'
+    b"\x00\x44\x64\x74\x5c\x4c\x44\x00"  # 122 'z'
+    b"\x00\x08\x08\x3e\x77\x41\x41\x00"  # 123 '{'
+    b"\x00\x00\x00\xff\xff\x00\x00\x00"  # 124 '|'
+    b"\x00\x41\x41\x77\x3e\x08\x08\x00"  # 125 '}'
+    b"\x00\x02\x03\x01\x03\x02\x03\x01"  # 126 '~'
+    b"\xaa\x55\xaa\x55\xaa\x55\xaa\x55"  # 127 (fallback for unknown characters)
+])
+
+# Glyph masks indexed as [char - 32, row, column]
+_GLYPHS = np.unpackbits(
+    np.frombuffer(FONT_8X8, dtype=np.uint8).reshape(96, 8, 1), axis=2, bitorder="little"
+).transpose(0, 2, 1).astype(bool)
+
+
+def rgb565_to_rgb888(pixels, order="RGB"):
+    """Expand RGB565 pixels to an (h, w, 3) uint8 image.
+
+    ``order`` is the COLOR_ORDER the colors were packed with, so the channels
+    come back in R, G, B order whatever the panel expects.
+    """
+    pixels = pixels.astype(np.uint32)
+    high = ((pixels >> 11) & 0x1F) * 255 // 31
+    mid = ((pixels >> 5) & 0x3F) * 255 // 63
+    low = (pixels & 0x1F) * 255 // 31
+    channels = dict(zip(order.upper(), (high, mid, low)))
+    return np.stack([channels["R"], channels["G"], channels["B"]], axis=-1).astype(np.uint8)
+
+
+class Raster:
+    """RGB565 canvas with framebuf-compatible drawing primitives."""
+
+    caps = frozenset({"arc"})
+
+    def __init__(self, width=240, height=240):
+        self.width = width
+        self.height = height
+        self.pixels = np.zeros((height, width), dtype=np.uint16)
+
+    def add(self, cmd, *args):
+        """Frame-builder interface: execute a command on the canvas."""
+        if cmd == "show":
+            return
+        getattr(self, cmd)(*args)
+
+    def fill(self, color):
+        self.pixels.fill(color)
+
+    def pixel(self, x, y, color):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y, x] = color
+
+    def fill_rect(self, x, y, w, h, color):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 < x1 and y0 < y1:
+            self.pixels[y0:y1, x0:x1] = color
+
+    def hline(self, x, y, w, color):
+        self.fill_rect(x, y, w, 1, color)
+
+    def vline(self, x, y, h, color):
+        self.fill_rect(x, y, 1, h, color)
+
+    def rect(self, x, y, w, h, color):
+        self.fill_rect(x, y, w, 1, color)
+        self.fill_rect(x, y + h - 1, w, 1, color)
+        self.fill_rect(x, y, 1, h, color)
+        self.fill_rect(x + w - 1, y, 1, h, color)
+
+    def line(self, x1, y1, x2, y2, color):
+        """Bresenham line including both end points, like framebuf.line."""
+        dx, dy = abs(x2 - x1), -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, color)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def _window(self, x0, y0, x1, y1):
+        """Clip a box to the screen; returns slices and pixel-centre grids."""
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.width), min(y1, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        ys, xs = np.mgrid[y0:y1, x0:x1]
+        return (slice(y0, y1), slice(x0, x1)), xs, ys
+
+    def ellipse(self, x, y, xr, yr, color, fill=False):
+        window = self._window(x - xr, y - yr, x + xr + 1, y + yr + 1)
+        if window is None:
+            return
+        region, xs, ys = window
+        inside = ((xs - x) / max(xr, 0.5)) ** 2 + ((ys - y) / max(yr, 0.5)) ** 2 <= 1.0
+        if not fill:
+            # Keep only pixels with a 4-neighbour outside the ellipse
+            padded = np.pad(inside, 1)
+            interior = padded[:-2, 1:-1] & padded[2:, 1:-1] & padded[1:-1, :-2] & padded[1:-1, 2:]
+            inside &= ~interior
+        self.pixels[region][inside] = color
+
+    def circle(self, x, y, r, color):
+        self.ellipse(x, y, r, r, color)
+
+    def arc(self, cx, cy, radius, thickness, start_deg, end_deg, color):
+        """Filled ring segment between two angles (0 deg = 3 o'clock, CCW)."""
+        window = self._window(cx - radius, cy - radius, cx + radius + 1, cy + radius + 1)
+        if window is None:
+            return
+        region, xs, ys = window
+        dx = xs - cx
+        dy = cy - ys
+        dist2 = dx * dx + dy * dy
+        outer = radius + 0.5
+        inner = max(radius - thickness + 0.5, 0)
+        mask = (dist2 < outer * outer) & (dist2 >= inner * inner)
+        lo, hi = min(start_deg, end_deg), max(start_deg, end_deg)
+        if hi - lo < 360:
+            angles = np.degrees(np.arctan2(dy, dx))
+            mask &= np.mod(angles - lo, 360) <= hi - lo
+        self.pixels[region][mask] = color
+
+    def text(self, text, x, y, color):
+        # Same encoding as encode_binary, so both render modes show the same glyphs
+        codes = np.frombuffer(str(text).encode("ascii", errors="replace"), dtype=np.uint8).astype(np.intp)
+        if not len(codes):
+            return
+        codes = np.where((codes < 32) | (codes > 127), 127, codes) - 32
+        # (rows, chars * columns) mask for the whole string
+        mask = _GLYPHS[codes].transpose(1, 0, 2).reshape(FONT_H, len(codes) * FONT_W)
+        window = self._window(x, y, x + mask.shape[1], y + FONT_H)
+        if window is None:
+            return
+        region, _, _ = window
+        mask = mask[region[0].start - y:region[0].stop - y, region[1].start - x:region[1].stop - x]
+        self.pixels[region][mask] = color
+
+
+def changed_bands(previous, current, merge_gap=FONT_H):
+    """Return (x, y, w, h) boxes covering every pixel that differs.
+
+    Changed rows are grouped into horizontal bands (bands closer than
+    ``merge_gap`` rows are merged) and each band is trimmed to its changed
+    columns.
+    """
+    if previous is None:
+        height, width = current.shape
+        return [(0, 0, width, height)]
+    diff = previous != current
+    rows = np.flatnonzero(diff.any(axis=1))
+    if not len(rows):
+        return []
+    breaks = np.flatnonzero(np.diff(rows) > merge_gap)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+    boxes = []
+    for y0, y1 in zip(starts, ends):
+        cols = np.flatnonzero(diff[y0:y1].any(axis=0))
+        x0, x1 = cols[0], cols[-1] + 1
+        boxes.append((int(x0), int(y0), int(x1 - x0), int(y1 - y0)))
+    return boxes
+
+
+class RasterScene:
+    """Last frame sent to the device, used to send only changed pixels."""
+
+    def __init__(self):
+        self.previous = None
+
+    def invalidate(self):
+        """Force a full-screen blit on the next update."""
+        self.previous = None
+
+    def update(self, frame, pixels):
+        """Blit the changed bands of ``pixels``. Returns True when sent."""
+        boxes = changed_bands(self.previous, pixels)
+        if not boxes:
+            return False
+        for x, y, w, h in boxes:
+            data = pixels[y:y + h, x:x + w].astype("<u2").tobytes()
+            frame.add("blit", x, y, w, h, data)
+        frame.add("show")
+        self.previous = pixels.copy()
+        return True
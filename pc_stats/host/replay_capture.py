@@ -0,0 +1,171 @@
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import serial
+
+from capture import KIND_STREAM, read_capture
+from protocol import PROTOCOL_VERSION, SESSION_IDLE_SEC, FlowControl, negotiate
+
+# Send a capture made with `pc_stats_sender.py --record FILE` to a display
+# again, at the recorded pace, as fast as the link and device allow, or at a
+# fixed frame rate. With --emulate the capture goes to a device emulator
+# started for the run, whose per-frame counters are printed at the end.
+#
+#   python pc_stats/host/replay_capture.py capture.pcsc --port COM8 --rate max
+#   python pc_stats/host/replay_capture.py capture.pcsc --emulate --rate 30
+
+EMULATOR_PATH = Path(__file__).resolve().parent.parent / "emulator" / "emulate_device.py"
+
+
+def load_stream(path, stream):
+    """Return the stream info and ``[(time, data), ...]`` of one recorded display."""
+    info, frames = None, []
+    for kind, record_stream, t, payload in read_capture(path):
+        if record_stream != stream:
+            continue
+        if kind == KIND_STREAM:
+            info = payload
+        else:
+            frames.append((t, payload))
+    if info is None:
+        raise ValueError(f"{path} has no stream {stream}")
+    return info, frames
+
+
+def start_emulator(extra_args):
+    """Start emulate_device.py and return ``(process, port)``."""
+    process = subprocess.Popen([sys.executable, str(EMULATOR_PATH), *extra_args],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Emulated device on "):
+        process.kill()
+        raise RuntimeError(f"Emulator did not start: {line.strip()}")
+    return process, line[len("Emulated device on "):].strip()
+
+
+def handshake(ser, info, window):
+    """Put the device in the recorded protocol; returns FlowControl or None."""
+    if info["protocol"] != "binary":
+        return None
+    reply = negotiate(ser)
+    if reply is None or reply[0] < PROTOCOL_VERSION:
+        raise RuntimeError("Device did not answer the binary protocol handshake")
+    missing = set(info["caps"]) - reply[1] - {"ack"}
+    if missing:
+        print(f"DEBUG: capture uses commands the device lacks: {', '.join(sorted(missing))}")
+    if window <= 0 or "ack" not in reply[1]:
+        return None
+    flow = FlowControl(ser, window)
+    flow.enable()
+    return flow
+
+
+def replay(ser, info, frames, rate, window, loops=1):
+    """Write the frames paced by ``rate`` ("recorded", "max" or frames per second)."""
+    flow = handshake(ser, info, window)
+    first = frames[0][0]
+    start = last_write = time.monotonic()
+    sent = sent_bytes = waits = 0
+    for _ in range(loops):
+        loop_start = time.monotonic()
+        for i, (t, data) in enumerate(frames):
+            if rate == "recorded":
+                due = loop_start + (t - first)
+            elif rate == "max":
+                due = None
+            else:
+                due = loop_start + i / rate
+            if due is not None:
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            if info["protocol"] == "binary" and time.monotonic() - last_write > SESSION_IDLE_SEC / 2:
+                # Long gap in the capture; keep the binary session alive
+                flow = handshake(ser, info, window)
+            if flow is not None:
+                while not flow.ready():
+                    waits += 1
+                    time.sleep(0.001)
+            ser.write(data)
+            if flow is not None:
+                flow.sent()
+            last_write = time.monotonic()
+            sent += 1
+            sent_bytes += len(data)
+    ser.flush()
+    if flow is not None:
+        # Count the frames the device has not finished yet
+        deadline = time.monotonic() + flow.timeout
+        while flow.in_flight and time.monotonic() < deadline:
+            flow.poll()
+            time.sleep(0.001)
+    elapsed = max(time.monotonic() - start, 1e-9)
+    result = {
+        "frames": sent,
+        "bytes": sent_bytes,
+        "seconds": elapsed,
+        "frames_per_sec": sent / elapsed,
+        "bytes_per_sec": sent_bytes / elapsed,
+    }
+    if flow is not None:
+        result["shows_acked"] = flow.acked
+        result["flow_waits"] = waits
+    return result
+
+
+def parse_rate(value):
+    if value in ("recorded", "max"):
+        return value
+    try:
+        rate = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("use recorded, max or a frame rate") from None
+    if rate <= 0:
+        raise argparse.ArgumentTypeError("frame rate must be positive")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a --record capture to a display")
+    parser.add_argument("capture", help="File written by pc_stats_sender.py --record")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--port", help="Serial port of the display")
+    target.add_argument("--emulate", action="store_true", help="Replay into a device emulator started for the run")
+    parser.add_argument("--emulator-args", default="", help="Extra emulate_device.py arguments, e.g. \"--png-dir out\"")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--stream", type=int, default=0, help="Display to replay when several were recorded")
+    parser.add_argument("--rate", type=parse_rate, default="recorded",
+                        help="recorded (original pace), max, or frames per second")
+    parser.add_argument("--loops", type=int, default=1, help="Replay the capture this many times")
+    parser.add_argument("--window", type=int, default=2,
+                        help="Frames in flight before waiting for device acks; 0 disables flow control")
+    args = parser.parse_args()
+
+    info, frames = load_stream(args.capture, args.stream)
+    if not frames:
+        parser.error(f"stream {args.stream} has no frames")
+    print(f"Stream {args.stream}: {len(frames)} frames from {info['port']} ({info['protocol']}), "
+          f"{frames[-1][0] - frames[0][0]:.1f} s recorded")
+
+    emulator = None
+    port = args.port
+    if args.emulate:
+        emulator, port = start_emulator(args.emulator_args.split())
+    try:
+        with serial.Serial(port, args.baud, timeout=1) as ser:
+            if emulator is None:
+                time.sleep(2)
+            result = replay(ser, info, frames, args.rate, args.window, args.loops)
+    finally:
+        if emulator is not None:
+            emulator.terminate()
+            print(f"Emulator: {emulator.communicate(timeout=10)[0].strip()}")
+    print(", ".join(f"{key} {value:.1f}" if isinstance(value, float) else f"{key} {value}"
+                    for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# Retained scene for incremental redraws
+#
+# Each widget is first drawn into CommandRecorders, one for its static
+# decoration and one for its value. The scene compares the recorded commands
+# with what it sent last time and only clears and redraws the parts whose
+# output changed, so steady-state traffic scales with the number of changed
+# values instead of the complexity of the layout.
+
+FONT_W = 8
+FONT_H = 8
+
+
+class CommandRecorder:
+    """Frame-builder stand-in that keeps commands instead of sending them."""
+
+    def __init__(self, caps=()):
+        self.caps = frozenset(caps)
+        self.commands = []
+
+    def add(self, cmd, *args):
+        self.commands.append((cmd,) + args)
+
+
+def command_bounds(command):
+    """Return the (x0, y0, x1, y1) box touched by a command, end-exclusive."""
+    cmd, args = command[0], command[1:]
+    if cmd == "text":
+        text, x, y = args[0], args[1], args[2]
+        return (x, y, x + len(str(text)) * FONT_W, y + FONT_H)
+    if cmd in ("rect", "fill_rect"):
+        x, y, w, h = args[:4]
+        return (x, y, x + w, y + h)
+    if cmd == "line":
+        x1, y1, x2, y2 = args[:4]
+        return (min(x1, x2), min(y1, y2), max(x1, x2) + 1, max(y1, y2) + 1)
+    if cmd == "hline":
+        x, y, w = args[:3]
+        return (x, y, x + w, y + 1)
+    if cmd == "vline":
+        x, y, h = args[:3]
+        return (x, y, x + 1, y + h)
+    if cmd == "pixel":
+        x, y = args[:2]
+        return (x, y, x + 1, y + 1)
+    if cmd in ("circle", "arc"):
+        x, y, r = args[:3]
+        return (x - r, y - r, x + r + 1, y + r + 1)
+    return None
+
+
+def command_boxes(command):
+    """Boxes of the pixels a command draws; an outline rect only touches its edges."""
+    if command[0] == "rect":
+        x, y, w, h = command[1:5]
+        return [(x, y, x + w, y + 1), (x, y + h - 1, x + w, y + h),
+                (x, y, x + 1, y + h), (x + w - 1, y, x + w, y + h)]
+    box = command_bounds(command)
+    return [] if box is None else [box]
+
+
+def union_bounds(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def commands_bounds(commands):
+    box = None
+    for command in commands:
+        box = union_bounds(box, command_bounds(command))
+    return box
+
+
+def contains(a, b):
+    return a[0] <= b[0] and a[1] <= b[1] and b[2] <= a[2] and b[3] <= a[3]
+
+
+def commands_boxes(commands):
+    """Boxes to test for overlap: the outline rects' edges plus one box around the rest."""
+    boxes, box = [], None
+    for command in commands:
+        if command[0] == "rect":
+            boxes += command_boxes(command)
+        else:
+            box = union_bounds(box, command_bounds(command))
+    return boxes if box is None else boxes + [box]
+
+
+def intersects(a, b):
+    if a is None or b is None:
+        return False
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class Scene:
+    """Last rendered state of every widget on the display."""
+
+    def __init__(self, background):
+        self.background = background
+        self.layout = None
+        self.widgets = []
+
+    def invalidate(self):
+        """Force a full redraw on the next update."""
+        self.layout = None
+
+    def update(self, frame, layout, parts):
+        """Send what changed since the previous update.
+
+        ``parts`` holds command lists that are compared and cleared
+        independently, e.g. a widget's static decoration and its value.
+        Returns True when a frame was sent.
+        """
+        new = [(commands, commands_bounds(commands), commands_boxes(commands)) for commands in parts]
+
+        if layout is not self.layout or len(new) != len(self.widgets):
+            frame.add("fill", self.background)
+            for commands, _, _ in new:
+                for command in commands:
+                    frame.add(*command)
+            frame.add("show")
+            self.layout = layout
+            self.widgets = new
+            return True
+
+        dirty = {i for i, (commands, _, _) in enumerate(new) if commands != self.widgets[i][0]}
+        if not dirty:
+            return False
+
+        # Clearing a part's box erases anything that overlaps it, so those
+        # neighbours have to be redrawn as well. An outline around a value
+        # only counts as overlapping if the cleared box reaches its edges.
+        cleared = {i: union_bounds(self.widgets[i][1], new[i][1]) for i in dirty}
+        changed = True
+        while changed:
+            changed = False
+            for i, (_, box, boxes) in enumerate(new):
+                if i in dirty:
+                    continue
+                if any(intersects(part, clear) for part in boxes for clear in cleared.values()):
+                    dirty.add(i)
+                    cleared[i] = union_bounds(self.widgets[i][1], box)
+                    changed = True
+
+        # A widget's value box usually lies inside its decoration's; clear it once
+        fills = []
+        for box in sorted((box for box in cleared.values() if box is not None),
+                          key=lambda box: (box[2] - box[0]) * (box[3] - box[1]), reverse=True):
+            if not any(contains(fill, box) for fill in fills):
+                fills.append(box)
+        for box in fills:
+            frame.add("fill_rect", box[0], box[1], box[2] - box[0], box[3] - box[1], self.background)
+        for i in sorted(dirty):
+            for command in new[i][0]:
+                frame.add(*command)
+        frame.add("show")
+        self.widgets = new
+        return True
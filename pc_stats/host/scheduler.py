@@ -0,0 +1,90 @@
+# Fixed-rate frame scheduling
+#
+# Sleeping for the interval after each frame makes the real period interval
+# plus render and transmit time, and the error accumulates. FrameScheduler
+# instead aims at absolute deadlines (start + n * period) on the monotonic
+# clock. When a frame overruns by more than a period the missed deadlines
+# are skipped rather than run back to back.
+
+import time
+from collections import deque
+
+# Upper edges of the lateness histogram buckets, in milliseconds
+LATENESS_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+
+class FrameScheduler:
+    """Pace a loop at ``period`` seconds and record how late frames start."""
+
+    def __init__(self, period, clock=time.monotonic, sleep=time.sleep, samples=1024):
+        self.period = period
+        self.clock = clock
+        self.sleep = sleep
+        self.deadline = None
+        self.frames = 0
+        self.skipped = 0
+        self.counts = [0] * (len(LATENESS_BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=samples)
+        self.max_lateness = 0.0
+
+    def wait(self):
+        """Sleep until the next frame is due and return its deadline."""
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now
+        else:
+            self.deadline += self.period
+            if now - self.deadline >= self.period:
+                # Overran by whole periods; drop those frames instead of bunching them
+                missed = int((now - self.deadline) // self.period)
+                self.deadline += missed * self.period
+                self.skipped += missed
+            if self.deadline > now:
+                self.sleep(self.deadline - now)
+                now = self.clock()
+        self.record(max(now - self.deadline, 0.0))
+        return self.deadline
+
+    def record(self, lateness):
+        self.frames += 1
+        ms = lateness * 1000
+        for i, edge in enumerate(LATENESS_BUCKETS_MS):
+            if ms < edge:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.recent.append(ms)
+        self.max_lateness = max(self.max_lateness, ms)
+
+    def histogram(self):
+        """Return ``{bucket label: frames}`` over all frames so far."""
+        labels = [f"<{edge}ms" for edge in LATENESS_BUCKETS_MS] + [f">={LATENESS_BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, self.counts))
+
+    def percentile(self, pct):
+        """Lateness percentile in ms over the recent frames."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "lateness_p50_ms": self.percentile(50),
+            "lateness_p95_ms": self.percentile(95),
+            "lateness_p99_ms": self.percentile(99),
+            "lateness_max_ms": self.max_lateness,
+            "histogram": self.histogram(),
+        }
+
+    def summary(self, histogram=False):
+        if not self.recent:
+            return "no frames yet"
+        text = (f"{self.frames} frames, {self.skipped} skipped, lateness p50 {self.percentile(50):.1f} ms "
+                f"p99 {self.percentile(99):.1f} ms max {self.max_lateness:.1f} ms")
+        if histogram:
+            text += "\nlateness: " + ", ".join(f"{label} {count}" for label, count in self.histogram().items() if count)
+        return text
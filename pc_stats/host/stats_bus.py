@@ -0,0 +1,212 @@
+import argparse
+import json
+import math
+import os
+import signal
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Stats publication bus
+#
+# One process samples the stats sources and publishes every snapshot into a
+# named shared-memory block; any number of readers (senders, scripts) map the
+# same block. The writer never waits for or even knows about readers, so
+# attaching and detaching costs the sampling loop nothing.
+#
+# The block is a seqlock: the writer makes the sequence number odd, writes
+# the values and makes it even again. A reader copies the values between two
+# reads of the sequence number and retries if it changed or was odd.
+#
+#   python pc_stats/host/stats_bus.py                # run the collector service
+#   python pc_stats/host/stats_bus.py --dump         # print what it publishes
+#   python pc_stats/host/pc_stats_sender.py --port COM8 --subscribe
+
+DEFAULT_BUS_NAME = "pc_stats"
+BUS_MAGIC = b"PCSB"
+BUS_VERSION = 1
+# magic, version, reserved, key count, key names length, sequence, publish time
+HEADER = struct.Struct("<4sHHIIQd")
+SEQ_OFFSET = 16
+SEQ = struct.Struct("<Q")
+STAMP = struct.Struct("<d")
+
+
+def values_offset(names_len):
+    # Keep the float64 values 8-byte aligned after the key names
+    return (HEADER.size + names_len + 7) & ~7
+
+
+class StatsPublisher:
+    """Owns the shared-memory block and writes snapshots into it.
+
+    The key list is fixed when the block is created; values are float64 with
+    NaN standing for a missing reading.
+    """
+
+    def __init__(self, keys, name=DEFAULT_BUS_NAME):
+        self.keys = list(keys)
+        names = json.dumps(self.keys).encode("utf-8")
+        self.offset = values_offset(len(names))
+        self.values = struct.Struct(f"<{len(self.keys)}d")
+        size = self.offset + self.values.size
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a service that did not shut down cleanly
+            print(f"DEBUG: replacing stale stats bus {name}")
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.seq = 0
+        HEADER.pack_into(self.shm.buf, 0, BUS_MAGIC, BUS_VERSION, 0, len(self.keys), len(names), 0, 0.0)
+        self.shm.buf[HEADER.size:HEADER.size + len(names)] = names
+
+    def publish(self, stats, t=None):
+        """Write one snapshot; ``t`` defaults to now on the monotonic clock."""
+        values = [math.nan if stats.get(key) is None else float(stats[key]) for key in self.keys]
+        buf = self.shm.buf
+        self.seq += 1
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+        STAMP.pack_into(buf, SEQ_OFFSET + SEQ.size, time.monotonic() if t is None else t)
+        self.values.pack_into(buf, self.offset, *values)
+        self.seq += 1
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(name):
+    """Map an existing block without taking ownership of it."""
+    shm = shared_memory.SharedMemory(name)
+    if os.name == "posix":
+        # The resource tracker would otherwise unlink the publisher's block when this process exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class StatsSubscriber:
+    """Read snapshots from a StatsPublisher in another process.
+
+    ``snapshot`` and ``stale`` match StatsCollector, so the sender can use
+    either. Each new snapshot is also appended to ``history``. The monotonic
+    clock is system-wide, so publish times compare across processes.
+    """
+
+    def __init__(self, name=DEFAULT_BUS_NAME, history=None, stale_after=5.0, retries=100):
+        self.name = name
+        self.history = history
+        self.stale_after = stale_after
+        self.retries = retries
+        self.shm = None
+        self.last_seq = 0
+        self.stale = []
+        self.attach()
+
+    def attach(self):
+        shm = attach(self.name)
+        magic, version, _, count, names_len, _, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != BUS_MAGIC or version != BUS_VERSION:
+            shm.close()
+            raise RuntimeError(f"{self.name} is not a version {BUS_VERSION} stats bus")
+        self.keys = json.loads(bytes(shm.buf[HEADER.size:HEADER.size + names_len]))
+        self.offset = values_offset(names_len)
+        self.values = struct.Struct(f"<{count}d")
+        if self.shm is not None:
+            self.shm.close()
+        self.shm = shm
+        self.last_seq = 0
+
+    def read(self):
+        """Return ``(seq, publish time, values)`` from a consistent snapshot."""
+        buf = self.shm.buf
+        for _ in range(self.retries):
+            seq, = SEQ.unpack_from(buf, SEQ_OFFSET)
+            if seq & 1:
+                time.sleep(0)
+                continue
+            published, = STAMP.unpack_from(buf, SEQ_OFFSET + SEQ.size)
+            values = self.values.unpack_from(buf, self.offset)
+            if SEQ.unpack_from(buf, SEQ_OFFSET)[0] == seq:
+                return seq, published, values
+        raise RuntimeError(f"stats bus {self.name} kept changing while being read")
+
+    def snapshot(self):
+        """Return a stats dict like StatsCollector.snapshot(); missing values are None."""
+        seq, published, values = self.read()
+        now = time.monotonic()
+        if seq == 0 or now - published > self.stale_after:
+            self.stale = ["bus"]
+            try:
+                # The service may have restarted with a new block
+                self.attach()
+            except (FileNotFoundError, RuntimeError):
+                pass
+            return {key: None for key in self.keys}
+        self.stale = []
+        stats = {key: None if math.isnan(value) else value for key, value in zip(self.keys, values)}
+        if seq != self.last_seq:
+            self.last_seq = seq
+            if self.history is not None:
+                self.history.record(stats, published)
+        return stats
+
+    def close(self):
+        self.shm.close()
+
+
+def stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    load_dotenv(Path(__file__).parent.parent / ".env")
+    parser = argparse.ArgumentParser(description="Sample stats once and publish them to shared memory")
+    parser.add_argument("--name", default=os.environ.get("STATS_BUS_NAME", DEFAULT_BUS_NAME),
+                        help="Shared-memory block name")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between published snapshots")
+    parser.add_argument("--dump", action="store_true", help="Subscribe and print snapshots instead of publishing")
+    args = parser.parse_args()
+
+    if args.dump:
+        subscriber = StatsSubscriber(args.name)
+        while True:
+            stats = subscriber.snapshot()
+            print(json.dumps({"stale": bool(subscriber.stale), **stats}), flush=True)
+            time.sleep(args.interval)
+
+    # The sender module holds the source setup; it also loads .env
+    import pc_stats_sender as sender
+    from scheduler import FrameScheduler
+
+    gpu_count = sender.gpu_reader.start()
+    print(f"GPUs: {', '.join(sender.gpu_reader.names) if gpu_count else 'none'}")
+    # Subscribers keep their own history
+    collector = sender.build_collector(args.interval, history=None)
+    keys = [key for source in collector.sources for key in source.keys]
+    publisher = StatsPublisher(keys, args.name)
+    print(f"Publishing {len(keys)} stats to {args.name}")
+    collector.start()
+    scheduler = FrameScheduler(args.interval)
+    # Remove the block on SIGTERM as well as Ctrl+C
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        while True:
+            scheduler.wait()
+            publisher.publish(collector.snapshot())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+        sender.close_sources()
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
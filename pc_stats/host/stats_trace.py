@@ -0,0 +1,143 @@
+# Stats traces
+#
+# StatsRecorder saves the stats snapshots the sender renders to a columnar
+# file, and StatsReplay plays such a file back in place of the live
+# collectors, so rendering can be tested and benchmarked on the exact
+# readings of a real session (a game, a render job) without the hardware.
+#
+# File layout (little-endian): magic "PCST", version (u8), key list length
+# (u32), key list (JSON), then blocks of up to BLOCK_ROWS samples:
+#
+#   rows (u32), times (f64 x rows), then one f32 x rows column per key
+#
+# Missing values are NaN. Blocks are written whole, so a trace cut off by a
+# killed sender loses at most the last partial block.
+
+import json
+import math
+import struct
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+TRACE_MAGIC = b"PCST"
+TRACE_VERSION = 1
+BLOCK_ROWS = 64
+COUNT = struct.Struct("<I")
+
+
+class StatsRecorder:
+    """Append snapshots to a trace; the keys are taken from the first one."""
+
+    def __init__(self, path, block_rows=BLOCK_ROWS):
+        self.handle = open(path, "wb")
+        self.block_rows = block_rows
+        self.keys = None
+        self.times = []
+        self.rows = []
+        self.samples = 0
+
+    def record(self, stats, t):
+        if self.keys is None:
+            self.keys = list(stats)
+            names = json.dumps(self.keys).encode("utf-8")
+            self.handle.write(TRACE_MAGIC + bytes((TRACE_VERSION,)) + COUNT.pack(len(names)) + names)
+            self.handle.flush()
+        self.times.append(t)
+        self.rows.append([math.nan if stats.get(key) is None else stats[key] for key in self.keys])
+        self.samples += 1
+        if len(self.rows) >= self.block_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        columns = np.asarray(self.rows, dtype="<f4").T
+        self.handle.write(COUNT.pack(len(self.rows)))
+        self.handle.write(np.asarray(self.times, dtype="<f8").tobytes())
+        self.handle.write(np.ascontiguousarray(columns).tobytes())
+        self.handle.flush()
+        self.times.clear()
+        self.rows.clear()
+
+    def close(self):
+        self.flush()
+        self.handle.close()
+
+
+def load_trace(path):
+    """Return ``(keys, times, columns)``; ``columns`` is (keys x samples) float32."""
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if data[:len(TRACE_MAGIC)] != TRACE_MAGIC or data[len(TRACE_MAGIC)] != TRACE_VERSION:
+        raise ValueError(f"{path} is not a version {TRACE_VERSION} stats trace")
+    offset = len(TRACE_MAGIC) + 1
+    names_len, = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    keys = json.loads(data[offset:offset + names_len])
+    offset += names_len
+    times, blocks = [], []
+    while offset + COUNT.size <= len(data):
+        rows, = COUNT.unpack_from(data, offset)
+        end = offset + COUNT.size + rows * 8 + rows * 4 * len(keys)
+        if end > len(data):
+            break
+        offset += COUNT.size
+        times.append(np.frombuffer(data, "<f8", rows, offset))
+        offset += rows * 8
+        blocks.append(np.frombuffer(data, "<f4", rows * len(keys), offset).reshape(len(keys), rows))
+        offset = end
+    if not blocks:
+        return keys, np.empty(0), np.empty((len(keys), 0), np.float32)
+    return keys, np.concatenate(times), np.concatenate(blocks, axis=1)
+
+
+class StatsReplay:
+    """Serve a recorded trace like StatsCollector.
+
+    In real time (``realtime=True``) ``snapshot`` returns the sample that
+    was current the same time after the start of the trace as has passed
+    since the replay started; otherwise every call moves to the next sample.
+    The trace starts over at the end. Samples are also appended to
+    ``history`` so graphs replay too.
+    """
+
+    def __init__(self, path, history=None, realtime=True, clock=time.monotonic):
+        self.keys, times, columns = load_trace(path)
+        if not len(times):
+            raise ValueError(f"{path} has no samples")
+        self.times = (times - times[0]).tolist()
+        self.samples = [self.sample(columns[:, i]) for i in range(len(self.times))]
+        # Length of one pass, with one typical interval before it wraps
+        self.duration = self.times[-1] + (self.times[-1] / max(len(self.times) - 1, 1))
+        self.history = history
+        self.realtime = realtime
+        self.clock = clock
+        self.start = None
+        self.index = -1
+        self.loops = 0
+        self.stale = []
+
+    def sample(self, column):
+        return {key: None if math.isnan(value) else value for key, value in zip(self.keys, column.tolist())}
+
+    def __iter__(self):
+        """Yield ``(time, stats)`` for every sample once, for benchmarks."""
+        return iter(zip(self.times, self.samples))
+
+    def snapshot(self):
+        if self.start is None:
+            self.start = self.clock()
+        if self.realtime:
+            elapsed = self.clock() - self.start
+            loops, offset = divmod(elapsed, self.duration) if self.duration else (0, 0.0)
+            index = max(bisect_right(self.times, offset) - 1, 0)
+            loops = int(loops)
+        else:
+            index = (self.index + 1) % len(self.samples)
+            loops = self.loops + (index == 0 and self.index >= 0)
+        if (index, loops) != (self.index, self.loops) and self.history is not None:
+            self.history.record(self.samples[index], self.start + loops * self.duration + self.times[index])
+        self.index, self.loops = index, loops
+        return self.samples[index]
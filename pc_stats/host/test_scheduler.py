@@ -0,0 +1,48 @@
+import pytest
+
+from scheduler import LATENESS_BUCKETS_MS, FrameScheduler
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the scheduler sleeps or a test advances it."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_histogram_counts_lateness_per_bucket():
+    clock = FakeClock()
+    scheduler = FrameScheduler(0.1, clock=clock, sleep=clock.sleep)
+    scheduler.wait()
+    # Render time before each wait; the deadline is 100 ms after the previous one
+    for work_ms in (0, 50, 101.5, 103, 130, 110):
+        clock.now += work_ms / 1000
+        scheduler.wait()
+
+    histogram = scheduler.histogram()
+    assert list(histogram) == [f"<{edge}ms" for edge in LATENESS_BUCKETS_MS] + [">=1000ms"]
+    assert histogram["<1ms"] == 3
+    assert histogram["<2ms"] == 1
+    assert histogram["<5ms"] == 1
+    assert histogram["<50ms"] == 2
+    assert sum(histogram.values()) == scheduler.frames == 7
+
+
+def test_overrun_skips_missed_deadlines():
+    clock = FakeClock()
+    scheduler = FrameScheduler(0.1, clock=clock, sleep=clock.sleep)
+    scheduler.wait()
+    clock.now += 0.37
+    deadline = scheduler.wait()
+
+    assert scheduler.skipped == 2
+    assert deadline == pytest.approx(100.3)
+    stats = scheduler.stats()
+    assert stats["histogram"]["<100ms"] == 1
+    assert stats["lateness_max_ms"] == pytest.approx(70)